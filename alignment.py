@@ -0,0 +1,147 @@
+import math
+from collections import deque
+
+GAP_POLICIES = ("hold", "interpolate", "nan")
+
+
+class _SensorState:
+    def __init__(self, max_lag):
+        self.base_index = None
+        self.last_index = None
+        self.pending = deque(maxlen=max_lag + 1)  # (frame, index, timestamp, values)
+        self.last = None  # last emitted (frame, timestamp, values)
+        self.gaps = 0
+        self.dropped = 0
+        self.gap_spans = []  # [first_index, last_index] of each run of filled samples
+
+    @property
+    def latest_frame(self):
+        if self.pending:
+            return self.pending[-1][0]
+        return self.last[0] if self.last else -1
+
+
+class SensorAligner:
+    # Joins the sample streams of several sensors into frames on the firmware
+    # sample index. Every sensor keeps a small ring buffer of samples that are
+    # not yet emitted; frame `f` is written out as soon as every sensor has
+    # reached it, so no sample is overwritten. A sensor that falls more than
+    # `max_lag` frames behind (or drops out) is filled according to
+    # `gap_policy` instead of stalling the others, which keeps memory bounded.
+    #
+    # Frame numbering starts once every sensor has sent at least one sample:
+    # the latest sample of each sensor at that point becomes frame 0. An
+    # index that jumps forward (a dropout) keeps its frame and the frames it
+    # skipped are filled; only an index that goes back (a board reset)
+    # re-bases the sensor. A sample more than `max_gap` frames ahead of the
+    # session is taken for a corrupt index and dropped.
+    def __init__(self, sensor_ids, gap_policy="hold", max_lag=50, max_gap=15000,
+                 period_ms=40.0, include_index=True):
+        if gap_policy not in GAP_POLICIES:
+            raise ValueError(f"Unknown gap policy: {gap_policy}")
+        self.sensor_ids = list(sensor_ids)
+        self.gap_policy = gap_policy
+        self.max_lag = max_lag
+        self.max_gap = max_gap
+        self.period_ms = period_ms
+        self.include_index = include_index
+        self.sensors = {i: _SensorState(max_lag) for i in self.sensor_ids}
+        self.next_frame = 0
+        self.started = False
+        self.frames_emitted = 0
+
+    def push(self, sensor_id, index, timestamp, values):
+        # Add one sample and return the rows that became complete
+        state = self.sensors[sensor_id]
+        if not self.started:
+            # Only the most recent sample matters until every sensor is live
+            state.pending.clear()
+            state.pending.append((0, index, timestamp, values))
+            state.last_index = index
+            if all(s.pending for s in self.sensors.values()):
+                for s in self.sensors.values():
+                    s.base_index = s.pending[0][1]
+                self.started = True
+            else:
+                return []
+        else:
+            frame = index - state.base_index
+            if index <= state.last_index:
+                if state.last_index - index <= self.max_lag:
+                    # Duplicate or reordered sample that is already covered
+                    state.dropped += 1
+                    return []
+                # Board reset: continue the numbering from here
+                frame = max(state.latest_frame + 1, self.next_frame)
+                state.base_index = index - frame
+            elif frame - self.next_frame > self.max_gap:
+                # Further ahead of the session than any dropout: a corrupt
+                # index, dropped so it cannot fill max_gap frames of rows
+                state.dropped += 1
+                return []
+            state.last_index = index
+            if frame < self.next_frame:
+                # Arrived after its frame was already written out as a gap
+                state.dropped += 1
+                return []
+            state.pending.append((frame, index, timestamp, values))
+        return self._drain(force=False)
+
+    def flush(self):
+        # Emit everything still buffered, filling sensors that stopped early
+        if not self.started:
+            return []
+        return self._drain(force=True)
+
+    def stats(self):
+        # gaps counts filled samples, dropped counts duplicate or late ones
+        return {i: {"gaps": s.gaps, "dropped": s.dropped, "gap_spans": [list(span) for span in s.gap_spans]}
+                for i, s in self.sensors.items()}
+
+    def _drain(self, force):
+        rows = []
+        while True:
+            latest = [s.latest_frame for s in self.sensors.values()]
+            lead = max(latest)
+            if self.next_frame > lead:
+                break
+            if min(latest) < self.next_frame and not force and lead - self.next_frame < self.max_lag:
+                break
+            rows.append(self._emit(self.next_frame))
+            self.next_frame += 1
+        return rows
+
+    def _emit(self, frame):
+        row = [None]
+        for sensor_id in self.sensor_ids:
+            state = self.sensors[sensor_id]
+            if state.pending and state.pending[0][0] == frame:
+                _, index, timestamp, values = state.pending.popleft()
+                state.last = (frame, timestamp, values)
+            else:
+                state.gaps += 1
+                index = state.base_index + frame
+                if state.gap_spans and state.gap_spans[-1][1] == index - 1:
+                    state.gap_spans[-1][1] = index
+                else:
+                    state.gap_spans.append([index, index])
+                timestamp, values = self._fill(state, frame)
+            if row[0] is None:
+                row[0] = round(timestamp, 3)
+            if self.include_index:
+                row.append(index)
+            row.extend(values)
+        self.frames_emitted += 1
+        return row
+
+    def _fill(self, state, frame):
+        last_frame, last_ts, last_values = state.last
+        timestamp = last_ts + (frame - last_frame) * self.period_ms
+        if self.gap_policy == "nan":
+            return timestamp, [math.nan] * len(last_values)
+        if self.gap_policy == "interpolate" and state.pending:
+            next_frame, _, next_ts, next_values = state.pending[0]
+            t = (frame - last_frame) / (next_frame - last_frame)
+            timestamp = last_ts + (next_ts - last_ts) * t
+            return timestamp, [a + (b - a) * t for a, b in zip(last_values, next_values)]
+        return timestamp, list(last_values)
@@ -10,6 +10,13 @@ LSM6DS3 myIMU(I2C_MODE, 0x6A);  // I2C device address 0x6A
 #define INTERVAL_MS (1000 / FREQUENCY_HZ)
 #define BUFFER_SIZE 100 // Adjust as needed
 
+// Notification format: 0 = CSV text lines, 1 = packed float32 records,
+// 2 = packed int16 records (accel in 0.01 m/s^2, gyro in 0.1 dps).
+// Binary notifications start with a version byte, see protocol.py.
+#define BINARY_PROTOCOL 0
+#define PROTOCOL_FLOAT32 0x81
+#define PROTOCOL_INT16 0x82
+
 struct IMUData {
   unsigned int index;
   float accelX, accelY, accelZ;
@@ -28,6 +35,13 @@ BLEService uartService("8E400004-B5A3-F393-E0A9-E50E24DCCA9E");
 BLECharacteristic rxCharacteristic("8E400005-B5A3-F393-E0A9-E50E24DCCA9E", BLENotify, 240);
 BLECharacteristic txCharacteristic("8E400006-B5A3-F393-E0A9-E50E24DCCA9E", BLENotify, 240);
 
+int16_t scaleToInt16(float value, float scale) {
+  float scaled = roundf(value * scale);
+  if (scaled > 32767.0f) return 32767;
+  if (scaled < -32768.0f) return -32768;
+  return (int16_t)scaled;
+}
+
 void setup() {
   Serial.begin(115200);  // Initialize serial communication
 
@@ -97,6 +111,50 @@ void loop() {
     if (millis() - lastBLETransmit >= 30) { // Reduced interval to 30ms
       lastBLETransmit = millis();
 
+#if BINARY_PROTOCOL == 1
+      uint8_t packet[240];
+      int packetLength = 0;
+      packet[packetLength++] = PROTOCOL_FLOAT32;
+
+      // Each record is a uint32 index followed by six float32 values (28 bytes)
+      while (tail != head && packetLength + 28 <= (int)sizeof(packet)) {
+        IMUData data = imuBuffer[tail];
+        tail = (tail + 1) % BUFFER_SIZE;
+
+        uint32_t index = data.index;
+        float values[6] = {data.accelX, data.accelY, data.accelZ,
+                           data.gyroX, data.gyroY, data.gyroZ};
+        memcpy(packet + packetLength, &index, sizeof(index));
+        memcpy(packet + packetLength + sizeof(index), values, sizeof(values));
+        packetLength += sizeof(index) + sizeof(values);
+      }
+
+      if (packetLength > 1) {
+        txCharacteristic.writeValue(packet, packetLength);
+      }
+#elif BINARY_PROTOCOL == 2
+      uint8_t packet[240];
+      int packetLength = 0;
+      packet[packetLength++] = PROTOCOL_INT16;
+
+      // Each record is a uint32 index followed by six scaled int16 values (16 bytes)
+      while (tail != head && packetLength + 16 <= (int)sizeof(packet)) {
+        IMUData data = imuBuffer[tail];
+        tail = (tail + 1) % BUFFER_SIZE;
+
+        uint32_t index = data.index;
+        int16_t values[6] = {scaleToInt16(data.accelX, 100.0f), scaleToInt16(data.accelY, 100.0f),
+                             scaleToInt16(data.accelZ, 100.0f), scaleToInt16(data.gyroX, 10.0f),
+                             scaleToInt16(data.gyroY, 10.0f), scaleToInt16(data.gyroZ, 10.0f)};
+        memcpy(packet + packetLength, &index, sizeof(index));
+        memcpy(packet + packetLength + sizeof(index), values, sizeof(values));
+        packetLength += sizeof(index) + sizeof(values);
+      }
+
+      if (packetLength > 1) {
+        txCharacteristic.writeValue(packet, packetLength);
+      }
+#else
       char imuData[240]; // Buffer for multiple IMU readings
       int dataLength = 0;
 
@@ -119,6 +177,7 @@ void loop() {
       if (dataLength > 0) {
         txCharacteristic.writeValue((const uint8_t*)imuData, dataLength);
       }
+#endif
     }
   }
 
@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from capture import Capture
+from compressed import CompressedSessionWriter, codec_for
+from session_writer import SessionWriter
+from simulator import AXES, PACKET_FILL, TRANSMIT_INTERVAL, format_line, synthetic_samples
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# End-to-end benchmark of the capture path, from notification bytes to rows
+# on disk: a Capture with its ingest queues, telemetry, quality monitor,
+# features and writer, its notification callbacks fed by synthetic firmware
+# streams instead of the radio. Every combination of sensor count, sample
+# rate and packet loss runs in its own process so peak RSS is per
+# configuration.
+#
+# Each configuration is run twice:
+#   - unpaced, as fast as possible: samples/s, CPU time per stage, and
+#     realtime_load, the fraction of real time the pipeline needs (1.0 is
+#     saturated)
+#   - paced at --speed times real time: latency from notification arrival
+#     to the row being flushed to the file, which includes waiting for the
+#     other sensors in the aligner and the writer's batching
+#
+#     python bench_ingest.py [--sensors 1 3 5 8] [--rates 25 100 400] [--loss 0 0.05]
+#                            [--seconds 5] [--speed 1] [--format csv|csv.gz|csv.zst]
+#                            [--output FILE] [--compare FILE]
+#
+# Results are saved as JSON (bench_results/ by default); --compare prints the
+# change against an earlier results file.
+
+STAGES = ["ingest", "parsing", "alignment", "features", "writing", "quality"]
+
+
+def synthetic_timeline(sensor_ids, rate_hz, seconds, loss, seed):
+    # Notifications of all sensors as [(arrival_s, [(sensor_id, [payload, ...]), ...])].
+    # Every TRANSMIT_INTERVAL each board sends what it sampled since the last
+    # send, packed like the firmware (lines appended until PACKET_FILL bytes),
+    # in as many notifications as it takes. Lost notifications are left out.
+    rng = random.Random(seed)
+    total = int(rate_hz * seconds)
+    streams = {i: synthetic_samples(i, rate_hz, rng) for i in sensor_ids}
+    timeline = []
+    lost = 0
+    sent = 0
+    tick = 0
+    while sent < total:
+        tick += 1
+        arrival = tick * TRANSMIT_INTERVAL
+        due = min(total, int(arrival * rate_hz))
+        batches = []
+        for sensor_id in sensor_ids:
+            packets = []
+            packet = bytearray()
+            count = 0
+            for n in range(sent, due):
+                packet += format_line(*next(streams[sensor_id]))
+                count += 1
+                if len(packet) >= PACKET_FILL or n == due - 1:
+                    if rng.random() >= loss:
+                        packets.append(bytes(packet))
+                    else:
+                        lost += count
+                    packet = bytearray()
+                    count = 0
+            if packets:
+                batches.append((sensor_id, packets))
+        sent = due
+        if batches:
+            timeline.append((arrival, batches))
+    return timeline, total * len(sensor_ids), lost
+
+
+class TimedWriter(SessionWriter):
+    # SessionWriter that notes when each row was flushed to the file and how
+    # much CPU time the writer thread spent writing. `received` is when the
+    # notifications the next rows come from arrived.
+    def __init__(self, filename, columns):
+        self.received = None
+        self.arrivals = deque()
+        self.latencies = []
+        self.cpu = 0.0
+        super().__init__(filename, columns)
+
+    def write_row(self, row):
+        self.arrivals.append(self.received)
+        super().write_row(row)
+
+    def _flush(self, pending):
+        start = time.thread_time()
+        count = len(pending)
+        super()._flush(pending)
+        flushed = time.perf_counter()
+        self.cpu += time.thread_time() - start
+        for _ in range(count):
+            self.latencies.append(flushed - self.arrivals.popleft())
+
+
+class TimedCompressedWriter(TimedWriter, CompressedSessionWriter):
+    pass
+
+
+class BenchManager:
+    # Stands in for BleManager: sensor names, and every sensor connected
+    def __init__(self, sensor_ids):
+        self.sensors = [(f"Sense S{i}", None, None) for i in sensor_ids]
+
+    def is_connected(self, sensor_id):
+        return True
+
+    async def disconnect(self, sensor_id):
+        pass
+
+
+class BenchEvents:
+    def post(self, kind, value=None):
+        pass
+
+    def post_latest(self, kind, value=None):
+        pass
+
+
+class TimedCapture(Capture):
+    # Capture that adds up the CPU time spent in each stage of the
+    # notification path, each stage without the stages it calls
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cpu = dict.fromkeys(STAGES, 0.0)
+        self._children = []
+        if self.features is not None:
+            push = self.features.push
+            self.features.push = lambda row: self.timed("features", push, row)
+
+    def timed(self, stage, function, *args):
+        start = time.thread_time()
+        self._children.append(0.0)
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.thread_time() - start
+            self.cpu[stage] += elapsed - self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+
+    def notification_handler(self, sensor_id, packets):
+        self.timed("ingest", super().notification_handler, sensor_id, packets)
+
+    def process_text(self, sensor_id, data):
+        self.timed("parsing", super().process_text, sensor_id, data)
+
+    def process_samples(self, sensor_id, samples):
+        self.timed("alignment", super().process_samples, sensor_id, samples)
+
+    def write_rows(self, rows):
+        self.timed("writing", super().write_rows, rows)
+
+    def check_quality(self, sensor_id, now):
+        self.timed("quality", super().check_quality, sensor_id, now)
+
+
+async def feed(capture, timeline, sensor_ids, speed):
+    # Play the timeline into the capture's notification callbacks on this
+    # loop, as bleak would, with the ingest queues and quality monitor running
+    writer = capture.writer
+    capture.started_at = time.perf_counter()
+    capture.session.bind()
+    callbacks = {}
+    consumers = []
+    for sensor_id in sensor_ids:
+        ingest, callbacks[sensor_id] = capture.open_ingest(sensor_id)
+        consumers.append((ingest, asyncio.create_task(ingest.run())))
+    monitor = asyncio.create_task(capture.monitor_quality())
+    start = time.perf_counter()
+    for arrival, batches in timeline:
+        if speed:
+            delay = start + arrival / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        writer.received = time.perf_counter()
+        for sensor_id, packets in batches:
+            for packet in packets:
+                capture.timed("ingest", callbacks[sensor_id], None, packet)
+        # Let the consumers run, as the loop does between notifications
+        await asyncio.sleep(0)
+    for ingest, consumer in consumers:
+        ingest.close()
+        await consumer
+    capture.session.request_stop()
+    await monitor
+    writer.received = time.perf_counter()
+    capture.finish_recording()
+    return time.perf_counter() - start
+
+
+def run_pipeline(timeline, sensor_ids, rate_hz, filename, speed=0.0):
+    # Feed the timeline through a Capture: ingest queues, framing, parsing,
+    # clocks, telemetry, quality, alignment, features and writing. speed=0
+    # runs unpaced, otherwise arrivals are replayed at speed times real time.
+    columns = ["timestamp"] + [f"s{i}_{axis}" for i in sensor_ids for axis in AXES]
+    config = {"sensors": sensor_ids, "columns": columns}
+    writer = (TimedCompressedWriter if codec_for(filename) else TimedWriter)(filename, columns)
+    capture = TimedCapture(BenchManager(sensor_ids), config, writer, BenchEvents(), frequency_hz=rate_hz)
+    wall = asyncio.run(feed(capture, timeline, sensor_ids, speed))
+    cpu = capture.cpu
+    cpu["writing"] += writer.cpu
+    return {
+        "wall_s": wall,
+        "samples": sum(sensor.samples for sensor in capture.telemetry.sensors.values()),
+        "parse_errors": capture.error_counter,
+        "frames": capture.aligner.frames_emitted,
+        "aligner": capture.aligner.stats(),
+        "cpu_s": cpu,
+        "latencies": writer.latencies,
+        "file_bytes": os.path.getsize(filename),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(config):
+    sensor_ids = list(range(1, config["sensors"] + 1))
+    rate_hz = config["rate_hz"]
+    seconds = config["seconds"]
+    baseline_rss = peak_rss_mb()
+    timeline, generated, lost = synthetic_timeline(sensor_ids, rate_hz, seconds, config["loss"], config["seed"])
+    notifications = sum(len(packets) for _, batches in timeline for _, packets in batches)
+
+    extension = "." + config.get("format", "csv")
+    with tempfile.TemporaryDirectory(dir=config.get("directory")) as directory:
+        unpaced = run_pipeline(timeline, sensor_ids, rate_hz, os.path.join(directory, "unpaced" + extension))
+        paced = None
+        if config["speed"]:
+            paced = run_pipeline(timeline, sensor_ids, rate_hz, os.path.join(directory, "paced" + extension),
+                                 speed=config["speed"])
+
+    # Samples that made it into the file as real values, not gap fills. The
+    # rest were lost in transit, dropped as late by the aligner, or sent
+    # before every sensor had started (the aligner starts on the latest ones)
+    recorded = sum(unpaced["frames"] - stats["gaps"] for stats in unpaced["aligner"].values())
+    cpu_total = sum(unpaced["cpu_s"].values())
+    result = dict(config)
+    result.update({
+        "notifications": notifications,
+        "samples_generated": generated,
+        "samples_per_s": unpaced["samples"] / unpaced["wall_s"],
+        "cpu_s": {stage: round(value, 6) for stage, value in unpaced["cpu_s"].items()},
+        "cpu_us_per_sample": 1e6 * cpu_total / max(unpaced["samples"], 1),
+        "realtime_load": unpaced["wall_s"] / seconds,
+        "lost_in_transit_pct": 100.0 * lost / generated,
+        "dropped_pct": 100.0 * (generated - recorded) / generated,
+        "late_samples": sum(stats["dropped"] for stats in unpaced["aligner"].values()),
+        "parse_errors": unpaced["parse_errors"],
+        "frames": unpaced["frames"],
+        "disk_kb_per_s": unpaced["file_bytes"] / 1000 / seconds,
+        "latency_ms": None,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    if paced is not None and paced["latencies"]:
+        latencies = np.array(paced["latencies"]) * 1000
+        result["latency_ms"] = {"p50": float(np.percentile(latencies, 50)),
+                                "p99": float(np.percentile(latencies, 99)),
+                                "max": float(latencies.max())}
+    return result
+
+
+def run_isolated(config):
+    # Fresh interpreter per configuration so peak RSS is its own
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--config", json.dumps(config)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def config_key(result):
+    return (result["sensors"], result["rate_hz"], result["loss"])
+
+
+def print_result(result):
+    latency = result["latency_ms"]
+    latency_text = f"p50 {latency['p50']:7.1f} p99 {latency['p99']:7.1f}" if latency else f"{'-':>23s}"
+    cpu = result["cpu_s"]
+    total = sum(cpu.values()) or 1.0
+    stages = " ".join(f"{stage[:5]} {100 * cpu[stage] / total:3.0f}%" for stage in STAGES)
+    rss = result["peak_rss_mb"]
+    print(f"{result['sensors']:3d} {result['rate_hz']:5d} {result['loss']:5.2f} "
+          f"{result['samples_per_s']:11,.0f} {result['realtime_load']:7.4f} {latency_text} "
+          f"{result['dropped_pct']:6.2f} {rss if rss is None else round(rss):>6} "
+          f"{result['disk_kb_per_s']:7.1f}  {stages}")
+
+
+def compare(results, previous_file):
+    with open(previous_file, 'r') as f:
+        previous = {config_key(r): r for r in json.load(f)["results"]}
+    print(f"\nChange against {previous_file}:")
+    for result in results:
+        old = previous.get(config_key(result))
+        if old is None:
+            continue
+        line = f"{result['sensors']:3d} {result['rate_hz']:5d} {result['loss']:5.2f}  " \
+               f"samples/s {result['samples_per_s'] / old['samples_per_s']:5.2f}x"
+        if result["latency_ms"] and old["latency_ms"]:
+            line += f"  p99 latency {result['latency_ms']['p99'] / old['latency_ms']['p99']:5.2f}x"
+        if result.get("disk_kb_per_s") and old.get("disk_kb_per_s"):
+            line += f"  disk {result['disk_kb_per_s'] / old['disk_kb_per_s']:5.2f}x"
+        print(line)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ingest benchmark on synthetic sensor streams")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1, 3, 5, 8])
+    parser.add_argument("--rates", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.05])
+    parser.add_argument("--seconds", type=float, default=5.0, help="seconds of data per configuration")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="time scale of the latency run, 0 skips it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "csv.gz", "csv.zst"], default="csv",
+                        help="recording format written by the pipeline")
+    parser.add_argument("--directory", help="where to write the benchmark files (default: system temp)")
+    parser.add_argument("--output", help="results file (default: bench_results/ingest_<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.config:
+        print(json.dumps(run_config(json.loads(args.config))))
+        return
+
+    print(f"{'sen':>3s} {'rate':>5s} {'loss':>5s} {'samples/s':>11s} {'load':>7s} "
+          f"{'latency ms':>23s} {'drop%':>6s} {'rss MB':>6s} {'disk kB/s':>9s}  cpu by stage")
+    results = []
+    for sensors in args.sensors:
+        for rate_hz in args.rates:
+            for loss in args.loss:
+                result = run_isolated({"sensors": sensors, "rate_hz": rate_hz, "loss": loss,
+                                       "seconds": args.seconds, "speed": args.speed, "seed": args.seed,
+                                       "format": args.format, "directory": args.directory})
+                print_result(result)
+                results.append(result)
+
+    output = args.output or os.path.join("bench_results", f"ingest_{datetime.now():%Y%m%d_%H%M%S}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"),
+                   "revision": git_revision(),
+                   "python": platform.python_version(),
+                   "numpy": np.__version__,
+                   "platform": platform.platform(),
+                   "processor": platform.processor(),
+                   "results": results}, f, indent=2)
+    print(f"Results saved to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import random
+import sys
+import time
+from datetime import datetime
+
+from framing import LineFramer
+import protocol
+
+# Compares the old per-line text parsing in notification_handler with the
+# framed, vectorized parse_text_block path on synthetic firmware output.
+# Both sides include the host timestamp the handler takes: once per line
+# before, once per parsed block now. With batch > 1 that many queued
+# notifications are framed and parsed together, which is where the
+# vectorized parse pulls ahead of the per-line loop.
+#
+#     python bench_parse.py [sensors] [seconds_of_data] [batch]
+
+FREQUENCY_HZ = 25
+
+
+def firmware_notifications(n_samples, seed):
+    # Same packing as the firmware: lines appended until 200 bytes are used
+    rng = random.Random(seed)
+    notifications = []
+    packet = b""
+    for index in range(n_samples):
+        line = b"%u,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n" % (
+            index, *(rng.uniform(-20, 20) for _ in range(3)), *(rng.uniform(-500, 500) for _ in range(3)))
+        packet += line
+        if len(packet) >= 200:
+            notifications.append(packet)
+            packet = b""
+    if packet:
+        notifications.append(packet)
+    return notifications
+
+
+def legacy_parse(streams):
+    samples = 0
+    for notifications in streams:
+        start_time = datetime.now()
+        buffer = ""
+        for data in notifications:
+            buffer += data.decode('utf-8')
+            while '\n' in buffer:
+                line, buffer = buffer.split('\n', 1)
+                if line.strip() == "":
+                    continue
+                try:
+                    parts = line.split(',')
+                    if len(parts) != 7:
+                        raise ValueError(f"Incorrect number of values: {len(parts)}")
+                    imu_values = list(map(float, parts))
+                    elapsed_time = (datetime.now() - start_time).total_seconds() * 1000
+                    samples += 1
+                except ValueError:
+                    pass
+    return samples
+
+
+def block_parse(streams, batch=1):
+    samples = 0
+    for notifications in streams:
+        start_time = datetime.now()
+        framer = LineFramer()
+        for i in range(0, len(notifications), batch):
+            block = framer.feed_block(b"".join(notifications[i:i + batch]))
+            if block:
+                parsed, errors = protocol.parse_text_block(block)
+                elapsed_time = (datetime.now() - start_time).total_seconds() * 1000
+                samples += len(parsed.tolist())
+    return samples
+
+
+def run(name, func, streams, repeat=5, **kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        samples = func(streams, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    notifications = sum(len(s) for s in streams)
+    print(f"{name:8s} {samples} samples in {best * 1000:.1f} ms  "
+          f"({best / notifications * 1e6:.2f} us/notification, {samples / best:,.0f} samples/s)")
+    return best
+
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    batches = [int(sys.argv[3])] if len(sys.argv) > 3 else [1, 4, 16]
+    streams = [firmware_notifications(FREQUENCY_HZ * seconds, seed) for seed in range(sensors)]
+    print(f"{sensors} sensors, {seconds}s at {FREQUENCY_HZ} Hz, "
+          f"{sum(len(s) for s in streams)} notifications")
+    legacy = run("legacy", legacy_parse, streams)
+    for batch in batches:
+        block = run(f"block/{batch}", block_parse, streams, batch=batch)
+        print(f"{'':8s} speedup {legacy / block:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench_ingest import git_revision
+
+# Cold start benchmark: launches `python -m zoommer capture` against the
+# simulated sensors (or real ones with --transport ble) and times, from the
+# moment the process is spawned,
+#   ready   the imports are done and the capture is being set up
+#   first   the first sample has been parsed
+#   exit    the recording is flushed and the process has exited
+# It also times the bare imports of the headless entry point against the
+# GUI module, which pulls in PyQt5.
+#
+#   python bench_startup.py --runs 10
+#   python bench_startup.py --transport ble --exercise "Skipping"
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))  # the child processes import from here
+IMPORTS = {
+    "headless": "import zoommer, capture, ble_manager",
+    "gui": "import main3",
+}
+
+
+def time_import(statement):
+    # Interpreter start-up plus the imports, in a fresh process
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", ZOOMMER_TRANSPORT="simulated")
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", statement], env=env, capture_output=True, text=True,
+                            cwd=REPO_DIR)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"{statement} failed")
+        return None
+    return elapsed
+
+
+def time_capture(exercise, transport, directory):
+    command = [sys.executable, "-u", "-m", "zoommer", "capture", "--exercise", exercise,
+               "--transport", transport, "--data-dir", directory, "--discard",
+               "--duration", "30", "--stop-after-first-sample"]
+    marks = {}
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=REPO_DIR)
+    output = []
+    for line in process.stdout:
+        output.append(line)
+        now = time.perf_counter() - started
+        if line.startswith("Capturing"):
+            marks["ready"] = now
+        elif line.startswith("First sample"):
+            marks["first"] = now
+    process.wait()
+    marks["exit"] = time.perf_counter() - started
+    if process.returncode != 0 or "first" not in marks:
+        print("".join(output[-5:]).rstrip())
+        return None
+    return marks
+
+
+def summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"median_s": statistics.median(values), "min_s": min(values), "max_s": max(values), "runs": len(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time from launching the headless capture to its first sample")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exercise", default="Skipping")
+    parser.add_argument("--transport", choices=["simulated", "ble"], default="simulated")
+    parser.add_argument("--output", help="results file (default: bench_results/startup_<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for name, statement in IMPORTS.items():
+        times = [time_import(statement) for _ in range(args.runs)]
+        failed = failed or None in times
+        results[f"import_{name}"] = summary(times)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(args.runs):
+            marks = time_capture(args.exercise, args.transport, directory)
+            if marks is None:
+                print("Capture run failed")
+                failed = True
+            runs.append(marks or {})
+    for mark in ("ready", "first", "exit"):
+        results[f"capture_{mark}"] = summary([run.get(mark) for run in runs])
+
+    for name, result in results.items():
+        if result is None:
+            print(f"{name:<16s} failed")
+        else:
+            print(f"{name:<16s} median {result['median_s'] * 1000:7.1f} ms  "
+                  f"min {result['min_s'] * 1000:7.1f}  max {result['max_s'] * 1000:7.1f}  ({result['runs']} runs)")
+    if failed:
+        # Timings with failed runs left out are not comparable, so nothing is saved
+        print("Some runs failed, no results saved")
+        return 1
+
+    output = args.output or os.path.join("bench_results", f"startup_{datetime.now():%Y%m%d_%H%M%S}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"),
+                   "revision": git_revision(),
+                   "python": platform.python_version(),
+                   "platform": platform.platform(),
+                   "exercise": args.exercise,
+                   "transport": args.transport,
+                   "results": results}, f, indent=2)
+    print(f"Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
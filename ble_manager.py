@@ -0,0 +1,201 @@
+import asyncio
+import threading
+
+from discovery import ADDRESS_CACHE_FILE, load_address_cache, save_address_cache
+from transport import BleakTransport, create_transport
+
+
+class LoopThread:
+    # One asyncio event loop in a background thread, shared by every
+    # BleManager that is given it. Connecting is serialized across all of
+    # them through `connect_lock`, since adapters handle one scan at a time.
+    def __init__(self, name="BleManager"):
+        self.name = name
+        self.loop = None
+        self.connect_lock = asyncio.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        # Schedule coro on the loop from any thread; returns a
+        # concurrent.futures.Future
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=5.0):
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+class BleManager:
+    # Long-lived owner of the BLE connections. It runs one event loop in a
+    # background thread for the lifetime of the app, so connections made for
+    # one exercise stay open for the next; a session only subscribes to and
+    # unsubscribes from notifications. `sensors` is the UART_SERVICE_UUIDS
+    # list, sensor ids are 1-based positions in it.
+    #
+    # Missing sensors are first connected directly at their last known
+    # address from the address cache; only the ones that fail are scanned
+    # for, with a scan that stops as soon as all of them have been seen.
+    #
+    # Scanning and clients come from `transport` (bleak by default, or a
+    # simulator from simulator.py). cache_file=None disables the cache.
+    # Managers for different sensor groups can share one `loop_thread`;
+    # without one the manager runs its own. `prefix` goes in front of every
+    # line the manager prints, to tell the groups apart.
+    def __init__(self, sensors, scan_timeout=10.0, direct_timeout=3.0, cache_file=ADDRESS_CACHE_FILE,
+                 transport=None, loop_thread=None, prefix=""):
+        self.sensors = sensors
+        self.prefix = prefix
+        self.transport = transport if transport is not None else BleakTransport()
+        self.scan_timeout = scan_timeout
+        self.direct_timeout = direct_timeout
+        self.cache_file = cache_file
+        self.addresses = load_address_cache(cache_file) if cache_file else {}
+        self.clients = {}
+        self._lost = {}
+        self._owns_loop = loop_thread is None
+        self.loop_thread = loop_thread if loop_thread is not None else LoopThread()
+
+    @property
+    def loop(self):
+        return self.loop_thread.loop
+
+    def log(self, message):
+        print(f"{self.prefix}{message}", flush=True)
+
+    def start(self):
+        self.loop_thread.start()
+
+    def submit(self, coro):
+        # Schedule coro on the manager loop from any thread; returns a
+        # concurrent.futures.Future
+        return self.loop_thread.submit(coro)
+
+    def shutdown(self, timeout=5.0):
+        # Disconnect this manager's sensors; the loop is only stopped if the
+        # manager owns it
+        if not self.loop_thread.running:
+            return
+        try:
+            self.submit(self.disconnect_all()).result(timeout)
+        except Exception as e:
+            self.log(f"Error disconnecting sensors: {e}")
+        if self._owns_loop:
+            self.loop_thread.stop(timeout)
+
+    def is_connected(self, sensor_id):
+        client = self.clients.get(sensor_id)
+        return client is not None and client.is_connected
+
+    async def connect(self, sensor_ids):
+        # Make sure every sensor in sensor_ids is connected, reusing open
+        # connections and only scanning for the ones that are missing.
+        # Returns {sensor_id: client} for the sensors that are connected.
+        async with self.loop_thread.connect_lock:
+            missing = [i for i in sensor_ids if not self.is_connected(i)]
+            cached = [i for i in missing if self.sensors[i - 1][0] in self.addresses]
+            await asyncio.gather(*(self._connect_device(i, self.addresses[self.sensors[i - 1][0]],
+                                                        timeout=self.direct_timeout) for i in cached))
+            missing = [i for i in missing if not self.is_connected(i)]
+            if missing:
+                devices = await self.transport.discover(self.sensors, missing, timeout=self.scan_timeout)
+                await asyncio.gather(*(self._connect_device(i, device) for i, device in devices.items()))
+            self._update_address_cache()
+            return {i: self.clients[i] for i in sensor_ids if self.is_connected(i)}
+
+    async def _connect_device(self, sensor_id, device, timeout=10.0):
+        name = self.sensors[sensor_id - 1][0]
+        try:
+            client = self.transport.create_client(
+                device, lambda c: self._on_disconnect(sensor_id, c), timeout)
+            await client.connect()
+        except Exception as e:
+            self.log(f"Error connecting to {name}: {e}")
+            return
+        self.log(f"Connected to {name}")
+        self._lost[sensor_id] = asyncio.Event()
+        self.clients[sensor_id] = client
+
+    def _update_address_cache(self):
+        changed = {}
+        for sensor_id, client in self.clients.items():
+            name = self.sensors[sensor_id - 1][0]
+            if self.addresses.get(name) != client.address:
+                self.addresses[name] = client.address
+                changed[name] = client.address
+        if changed and self.cache_file:
+            # Merge into the file as it is now, other managers may share it
+            cache = load_address_cache(self.cache_file)
+            cache.update(changed)
+            try:
+                save_address_cache(cache, self.cache_file)
+            except OSError as e:
+                self.log(f"Error saving {self.cache_file}: {e}")
+
+    def _on_disconnect(self, sensor_id, client):
+        if self.clients.get(sensor_id) is client:
+            del self.clients[sensor_id]
+            self._lost[sensor_id].set()
+        self.log(f"Disconnected from {self.sensors[sensor_id - 1][0]}")
+
+    async def wait_disconnected(self, sensor_id):
+        # Returns once the current connection to the sensor is lost
+        if not self.is_connected(sensor_id):
+            return
+        await self._lost[sensor_id].wait()
+
+    async def start_notify(self, sensor_id, callback):
+        char_uuid = self.sensors[sensor_id - 1][2]
+        await self.clients[sensor_id].start_notify(char_uuid, callback)
+
+    async def stop_notify(self, sensor_id):
+        client = self.clients.get(sensor_id)
+        if client is None or not client.is_connected:
+            return
+        char_uuid = self.sensors[sensor_id - 1][2]
+        try:
+            await client.stop_notify(char_uuid)
+        except Exception as e:
+            self.log(f"Error unsubscribing from {self.sensors[sensor_id - 1][0]}: {e}")
+
+    async def disconnect(self, sensor_id):
+        # Drop one connection, e.g. to reset a sensor that sends bad data
+        client = self.clients.get(sensor_id)
+        if client is None:
+            return
+        try:
+            await client.disconnect()
+        except Exception as e:
+            self.log(f"Error disconnecting {self.sensors[sensor_id - 1][0]}: {e}")
+
+    async def disconnect_all(self):
+        clients = list(self.clients.values())
+        self.clients.clear()
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+
+def create_ble_manager(kind, sensors, loop_thread=None, prefix="", **options):
+    # kind and options as for transport.create_transport
+    if kind == "ble":
+        return BleManager(sensors, loop_thread=loop_thread, prefix=prefix)
+    # Simulated sensors must not overwrite the cached real addresses
+    return BleManager(sensors, cache_file=None, transport=create_transport(kind, sensors, **options),
+                      loop_thread=loop_thread, prefix=prefix)
@@ -0,0 +1,63 @@
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class GuiBridge(QObject):
+    # The one way from the BLE loop thread to the GUI. Other threads only
+    # append to a locked queue; a QTimer on the GUI thread drains it every
+    # `interval_ms` and calls the subscribers there.
+    #
+    # post() events are delivered in order, one call each (lifecycle events,
+    # dialogs). post_latest() events are coalesced: only the last value per
+    # kind since the previous tick is delivered, so status, error and metrics
+    # updates cost at most one GUI update per tick however fast they come.
+    def __init__(self, interval_ms=50):
+        super().__init__()
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._events = deque()
+        self._latest = {}
+        self._subscribers = {}
+        self._timer = None
+
+    def start(self):
+        # Call on the GUI thread once the QApplication exists
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.timeout.connect(self.drain)
+        self._timer.start(self.interval_ms)
+
+    def subscribe(self, kind, callback):
+        self._subscribers.setdefault(kind, []).append(callback)
+
+    def post(self, kind, value=None):
+        with self._lock:
+            self._events.append((kind, value))
+
+    def post_latest(self, kind, value=None):
+        with self._lock:
+            self._latest[kind] = value
+
+    def drain(self):
+        with self._lock:
+            latest = self._latest
+            self._latest = {}
+        for kind, value in latest.items():
+            self._dispatch(kind, value)
+        # One event at a time: a subscriber that opens a modal dialog runs a
+        # nested event loop, whose ticks carry on with the following events
+        while True:
+            with self._lock:
+                if not self._events:
+                    return
+                kind, value = self._events.popleft()
+            self._dispatch(kind, value)
+
+    def _dispatch(self, kind, value):
+        for callback in self._subscribers.get(kind, []):
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"Error handling {kind} event: {e}")
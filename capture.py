@@ -0,0 +1,444 @@
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import string
+import time
+
+from alignment import SensorAligner
+import catalog
+from compressed import CompressedSessionWriter, split_extension
+from exercises import column_prefix
+from features import FeatureExtractor
+from framing import LineFramer
+from ingest import IngestQueue
+import protocol
+from quality import QualityMonitor
+import recording
+import records
+from session import CaptureSession
+from session_writer import SessionWriter
+from telemetry import SessionTelemetry
+from timing import DeviceClocks
+
+FREQUENCY_HZ = 25  # Must match FREQUENCY_HZ in the firmware
+GAP_POLICY = "hold"  # How the aligner fills missing samples: hold, interpolate or nan
+INGEST_QUEUE_SIZE = 256  # Notifications buffered per sensor before the overflow policy applies
+INGEST_OVERFLOW_POLICY = "drop-oldest"  # drop-oldest or count-and-drop
+ALIGN_MAX_LAG = 100  # Frames to wait for a late sensor; the firmware buffers 100 samples while disconnected
+RECONNECT_MIN_DELAY = 0.5  # Seconds before the first reconnect attempt, doubled after each failure
+RECONNECT_MAX_DELAY = 8.0
+QUALITY_CHECK_INTERVAL = 1.0  # Seconds between quality checks of every connected sensor
+FEATURE_STREAM = True  # Write rolling features (features.py) next to each recording
+FEATURES_SUFFIX = ".features.csv"
+
+
+def create_aligner(config, frequency_hz=FREQUENCY_HZ):
+    # Exercises whose columns include "<sensor>_index" keep the firmware index
+    # in the CSV, the others only carry the six IMU values per sensor
+    sensors = config["sensors"]
+    include_index = len(config["columns"]) - 1 == 7 * len(sensors)
+    return SensorAligner(sensors, gap_policy=GAP_POLICY, max_lag=ALIGN_MAX_LAG,
+                         period_ms=1000 / frequency_hz, include_index=include_index)
+
+
+def generate_hashed_id(info):
+    # Generate a random string
+    random_str = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
+
+    # Get the current timestamp
+    timestamp = str(time.time())
+
+    # Combine the information with the random string and timestamp
+    input_str = f"{info}_{random_str}_{timestamp}"
+
+    # Generate the hash
+    hash_object = hashlib.sha256(input_str.encode('utf-8'))
+    return hash_object.hexdigest()[:20]  # Use the first 20 characters of the hash
+
+
+def new_record(exercise_name, school_name="", date="", name="", grade="", height="", gender=""):
+    # Exercise record for a new recording; file_id names its data file
+    return {
+        "school_name": school_name,
+        "date": date,
+        "name": name,
+        "grade": grade,
+        "height": height,
+        "gender": gender,
+        "exercise_name": exercise_name,
+        "file_id": generate_hashed_id(f"{school_name}_{date}_{grade}_{exercise_name}"),
+        "label": None  # Initially, label is None
+    }
+
+
+RECORDING_FORMATS = ("csv", "csv.gz", "csv.zst", "binary")
+
+
+def create_writer(directory, record, columns, recording_format="csv"):
+    # csv; csv.gz or csv.zst for compressed CSV (compressed.py); or binary
+    # for chunked .zrec files (convert with recording.py to-csv)
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, record["file_id"])
+    if recording_format == "binary":
+        return recording.BinarySessionWriter(base + recording.EXTENSION, columns, metadata=record)
+    if recording_format in ("csv.gz", "csv.zst"):
+        return CompressedSessionWriter(f"{base}.{recording_format}", columns)
+    return SessionWriter(base + ".csv", columns)
+
+
+class Capture:
+    # One recording of one sensor group: the framers, aligner, writer, error
+    # counts and telemetry of a session live here instead of in module
+    # globals, so several groups can record at once. Each group has its own
+    # BleManager (its own device list, sensor ids are 1-based positions in
+    # it) and its own writer; the managers can share one LoopThread.
+    #
+    # `config` is an EXERCISE_CONFIG entry. `events` receives post() and
+    # post_latest() calls from the loop thread (a GuiBridge, or any object
+    # with those two methods):
+    #   message, abort, first_sample (value: seconds since start),
+    #   session_stopped (value: stop latency or -1.0), status, error, metrics
+    # Everything posted as a message, abort or status is also printed by the
+    # capture itself, with `prefix` in front to tell concurrent groups apart,
+    # so event sinks never need to print.
+    def __init__(self, ble_manager, config, writer, events, frequency_hz=FREQUENCY_HZ, features=FEATURE_STREAM,
+                 prefix=""):
+        self.ble_manager = ble_manager
+        self.sensors = ble_manager.sensors
+        self.config = config
+        self.sensor_ids = list(config["sensors"])
+        self.writer = writer
+        self.events = events
+        self.frequency_hz = frequency_hz
+        self.prefix = prefix
+        self.framers = {i: LineFramer() for i in self.sensor_ids}
+        self.clocks = DeviceClocks(self.sensor_ids, frequency_hz)
+        self.arrivals = dict.fromkeys(self.sensor_ids)  # when each sensor's latest notification came in
+        self.aligner = create_aligner(config, frequency_hz)
+        self.error_counter = 0
+        self.parse_errors = {}
+        self.quality = QualityMonitor(self.sensor_ids, frequency_hz)
+        self.abort_posted = False
+        self.ever_connected = set()  # sensors connected at some point this session
+        self._tasks = set()
+        self.telemetry = SessionTelemetry(self.sensor_ids,
+                                          {i: self.name(i).replace("Sense ", "") for i in self.sensor_ids})
+        self.rings = {}  # {sensor_id: preview.SignalRing} to feed a live preview
+        self.features = None
+        self.feature_writer = None
+        if features:
+            self.features = FeatureExtractor(config["columns"], frequency_hz)
+            self.feature_writer = SessionWriter(split_extension(writer.filename)[0] + FEATURES_SUFFIX,
+                                                self.features.columns)
+        self.session = CaptureSession()
+        self.future = None
+        self.started_at = None
+        self.first_sample_at = None
+
+    def name(self, sensor_id):
+        return self.sensors[sensor_id - 1][0]
+
+    def log(self, message):
+        print(f"{self.prefix}{message}", flush=True)
+
+    def feature_summary(self, sensor_id):
+        # Latest rolling features of one sensor as a line of text, for live displays
+        if self.features is None:
+            return ""
+        return self.features.summary(column_prefix(self.name(sensor_id)))
+
+    def start(self):
+        # Schedule the capture on the manager's loop; returns immediately
+        self.started_at = time.perf_counter()
+        self.future = self.ble_manager.submit(self.run())
+        return self.future
+
+    def is_running(self):
+        return self.future is not None and not self.future.done()
+
+    def stop(self):
+        # Returns immediately; session_stopped is posted once the data is on disk
+        self.session.request_stop()
+
+    def sensor_report(self):
+        # Per-sensor gap accounting that is saved with the exercise record, so
+        # downstream processing knows which index spans were filled in
+        report = {}
+        clocks = self.clocks.report()
+        quality = self.quality.report()
+        for sensor_id, stats in self.aligner.stats().items():
+            report[self.name(sensor_id)] = {
+                "missing_samples": stats["gaps"],
+                "gap_spans": stats["gap_spans"],
+                "late_samples": stats["dropped"],
+                "reconnects": self.session.reconnects[sensor_id],
+                "parse_errors": self.parse_errors.get(sensor_id, 0),
+                "clock": clocks[sensor_id],
+                "quality": quality[sensor_id],
+            }
+        return report
+
+    def save(self, record, label, records_dir=records.RECORDS_DIR, catalog_file=catalog.CATALOG_FILE):
+        # Once stopped: label the recording, rename it to
+        # <file_id>_<exercise>, write its telemetry next to it and add it to
+        # the exercise log in records_dir and to the catalog. Returns the
+        # new filename.
+        exercise_name = record["exercise_name"]
+        record["label"] = label  # Update the label in the record
+        record["sensors"] = self.sensor_report()
+        record["rows"] = self.writer.rows_written
+        record["duration_s"] = round(self.aligner.frames_emitted / self.frequency_hz, 3)
+        if self.writer.error is not None:
+            # Saved all the same, as the rows before the failure are good,
+            # but marked so nothing downstream takes it for a whole session
+            record["complete"] = False
+            record["write_error"] = str(self.writer.error)
+            record["rows_lost"] = self.writer.rows_lost
+        base, ext = split_extension(self.writer.filename)
+        new_filename = f"{base}_{exercise_name}{ext}"
+        record["filename"] = new_filename
+        os.rename(self.writer.filename, new_filename)
+        try:
+            self.telemetry.export(f"{base}_{exercise_name}.telemetry.json", self.aligner)
+        except OSError as e:
+            self.log(f"Error saving telemetry: {e}")
+        if self.feature_writer is not None:
+            record["features_filename"] = f"{base}_{exercise_name}{FEATURES_SUFFIX}"
+            os.rename(self.feature_writer.filename, record["features_filename"])
+        if ext == recording.EXTENSION:
+            recording.append_metadata(new_filename, record)
+
+        # Append the record with the label to the exercise log
+        records.append_record(record["date"], record, records_dir)
+        try:
+            catalog.add_session(record, catalog_file)
+        except sqlite3.Error as e:
+            self.log(f"Error updating session catalog: {e}")
+        return new_filename
+
+    def discard(self):
+        os.remove(self.writer.filename)
+        if self.feature_writer is not None:
+            os.remove(self.feature_writer.filename)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.writer.write_row(row)
+            if self.features is not None:
+                features = self.features.push(row)
+                if features is not None:
+                    self.feature_writer.write_row(features)
+
+    def report_error(self, sensor_id, message):
+        self.error_counter += 1
+        self.parse_errors[sensor_id] = self.parse_errors.get(sensor_id, 0) + 1
+        self.telemetry.sensors[sensor_id].on_error()
+        self.log(message)
+        self.quality.sensors[sensor_id].on_error(time.monotonic())
+        self.events.post_latest("error", f"{self.name(sensor_id)}: {message} ({self.error_counter} errors)")
+
+    def check_quality(self, sensor_id, now):
+        # Acts on the quality monitor's verdict; abort is posted once per session
+        verdict = self.quality.check(sensor_id, now)
+        if verdict is None:
+            return
+        action, reason = verdict
+        name = self.name(sensor_id)
+        if action == "abort":
+            if not self.abort_posted:
+                self.abort_posted = True
+                self.log(f"{name}: {reason}, aborting")
+                self.events.post("abort", f"Bad data from {name} ({reason}), stop and restart")
+        elif action == "reconnect":
+            self.log(f"{name}: {reason}, reconnecting")
+            self.events.post_latest("status", f"{name}: {reason}, reconnecting...")
+            task = asyncio.ensure_future(self.ble_manager.disconnect(sensor_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif action == "warn":
+            self.log(f"{name}: {reason}")
+            self.events.post_latest("status", f"Check {name}: {reason}")
+        else:
+            self.log(f"{name}: data looks good again")
+            self.events.post_latest("status", f"{name}: data looks good again")
+
+    def process_samples(self, sensor_id, samples):
+        if not len(samples):
+            return
+        # Sample times come from the firmware index on the sensor's fitted
+        # clock, not from when the burst happened to arrive
+        timestamps = self.clocks.timestamps_ms(sensor_id, samples[:, 0], self.arrivals[sensor_id])
+        if self.first_sample_at is None:
+            self.first_sample_at = time.perf_counter()
+            self.events.post("first_sample", self.first_sample_at - self.started_at)
+        now = time.monotonic()
+        self.telemetry.sensors[sensor_id].on_samples(samples[:, 0], now)
+        self.quality.sensors[sensor_id].on_samples(samples[:, 0], samples[:, 1:], now)
+        ring = self.rings.get(sensor_id)
+        if ring is not None:
+            ring.extend(samples[:, 1:])
+        for sample, timestamp in zip(samples.tolist(), timestamps.tolist()):
+            self.write_rows(self.aligner.push(sensor_id, int(sample[0]), timestamp, sample[1:]))
+
+    def process_text(self, sensor_id, data):
+        block = self.framers[sensor_id].feed_block(data)
+        if not block:
+            return
+        samples, errors = protocol.parse_text_block(block)
+        for line, message in errors:
+            self.report_error(sensor_id, f"Error: {message}. Received line: {line.decode('utf-8', 'replace')}")
+        self.process_samples(sensor_id, samples)
+
+    def notification_handler(self, sensor_id, packets):
+        # Called by the sensor's IngestQueue with every notification that
+        # queued up since the last call, in arrival order
+        handler_start = time.perf_counter()
+        text = []
+        for data in packets:
+            if not protocol.is_binary(data):
+                text.append(data)
+                continue
+            # Binary notifications always carry whole records, no framing needed
+            if text:
+                self.process_text(sensor_id, b"".join(text))
+                text = []
+            try:
+                samples = protocol.decode_notification(data)
+            except ValueError as e:
+                self.report_error(sensor_id, f"Error: {e}")
+                continue
+            self.process_samples(sensor_id, samples)
+        if text:
+            self.process_text(sensor_id, b"".join(text))
+        self.telemetry.sensors[sensor_id].on_handled(time.perf_counter() - handler_start)
+        self.events.post_latest("metrics")
+
+    async def monitor_quality(self):
+        # Checks the sensors on a timer, not from their notifications, so one
+        # that stays connected but stops sending is judged too, and so is one
+        # that never connected: it counts as silent from the start. A sensor
+        # that dropped out is left to the reconnect loop in record_sensor.
+        session = self.session
+        while not session.stopping:
+            await session.until_stopped(asyncio.sleep(QUALITY_CHECK_INTERVAL))
+            if session.stopping:
+                break
+            now = time.monotonic()
+            for sensor_id in self.sensor_ids:
+                if sensor_id not in self.ever_connected or self.ble_manager.is_connected(sensor_id):
+                    self.check_quality(sensor_id, now)
+
+    def finish_recording(self):
+        # Write out the frames the aligner still holds and close the files
+        self.write_rows(self.aligner.flush())
+        self.writer.close()
+        if self.feature_writer is not None:
+            self.feature_writer.close()
+        for writer in (self.writer, self.feature_writer):
+            if writer is not None and writer.error is not None:
+                message = (f"Could not write {writer.filename}: {writer.error}. "
+                           f"The recording is incomplete ({writer.rows_lost} rows lost).")
+                self.log(message)
+                self.events.post("message", message)
+
+    def open_ingest(self, sensor_id):
+        # The sensor's IngestQueue and the notification callback that feeds
+        # it; run() the queue on the capture loop
+        ingest = IngestQueue(sensor_id, self.notification_handler, maxsize=INGEST_QUEUE_SIZE,
+                             policy=INGEST_OVERFLOW_POLICY)
+        sensor_telemetry = self.telemetry.sensors[sensor_id]
+
+        def on_notification(sender, data):
+            now = time.monotonic()
+            self.arrivals[sensor_id] = now
+            ingest.offer(data)
+            sensor_telemetry.on_notification(len(data), ingest.depth, now)
+        return ingest, on_notification
+
+    async def record_sensor(self, sensor_id):
+        # Stream one sensor into the session until it stops. If the
+        # connection drops, or the sensor was not found at the start, keep
+        # trying to connect with exponential backoff; the aligner fills and
+        # records the samples that never arrive.
+        session = self.session
+        ble_manager = self.ble_manager
+        name = self.name(sensor_id)
+        if ble_manager.is_connected(sensor_id):
+            self.ever_connected.add(sensor_id)
+        ingest, on_notification = self.open_ingest(sensor_id)
+        consumer = asyncio.create_task(ingest.run())
+
+        delay = RECONNECT_MIN_DELAY
+        try:
+            while not session.stopping:
+                if not ble_manager.is_connected(sensor_id):
+                    clients = await session.until_stopped(ble_manager.connect([sensor_id]))
+                    if session.stopping:
+                        break
+                    verb = "reconnect" if sensor_id in self.ever_connected else "connect"
+                    if not clients:
+                        self.log(f"Could not {verb} to {name}, retrying in {delay:.1f}s")
+                        self.events.post_latest("status", f"Could not {verb} to {name}, retrying...")
+                        await session.until_stopped(asyncio.sleep(delay))
+                        delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                        continue
+                    self.quality.sensors[sensor_id].on_reconnect()
+                    if sensor_id in self.ever_connected:
+                        session.reconnects[sensor_id] += 1
+                        self.log(f"Reconnected to {name}")
+                        self.events.post_latest("status", f"Reconnected to {name}")
+                    else:
+                        self.ever_connected.add(sensor_id)
+                        self.log(f"Connected to {name}")
+                        self.events.post_latest("status", f"Connected to {name}")
+                try:
+                    await ble_manager.start_notify(sensor_id, on_notification)
+                except Exception as e:
+                    self.log(f"Error subscribing to {name}: {e}")
+                    await session.until_stopped(asyncio.sleep(delay))
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                    continue
+                delay = RECONNECT_MIN_DELAY
+                await session.until_stopped(ble_manager.wait_disconnected(sensor_id))
+                if not session.stopping:
+                    self.log(f"Lost connection to {name}")
+                    self.events.post_latest("status", f"Lost connection to {name}, reconnecting...")
+        finally:
+            await ble_manager.stop_notify(sensor_id)
+            ingest.close()
+            await consumer
+            self.log(f"Ingest for {name}: {ingest.stats()}")
+
+    async def scan_and_connect(self):
+        # Connections are kept open between exercises, so this only scans for
+        # and connects the sensors that are not connected yet
+        clients = await self.session.until_stopped(self.ble_manager.connect(self.sensor_ids))
+        if clients is None:
+            return
+        message = f"Connected to: {', '.join(self.name(i) for i in clients) or 'none'}"
+        missing = [self.name(i) for i in self.sensor_ids if i not in clients]
+        if missing:
+            message += f". Still looking for: {', '.join(missing)}"
+        self.log(message)
+        self.events.post("message", message)
+        # Sensors that were not found keep being retried; until every one
+        # has sent data no rows are written, and the quality monitor warns
+        # and then aborts about the ones that stay silent
+        await self.session.supervise([self.record_sensor(i) for i in self.sensor_ids] + [self.monitor_quality()])
+
+    async def run(self):
+        self.session.bind()
+        try:
+            await self.scan_and_connect()
+        except Exception as e:
+            self.log(f"Capture error: {e}")
+            self.events.post("message", f"Capture error: {e}")
+        # Flush the writer off the loop before the file is handed back
+        await asyncio.to_thread(self.finish_recording)
+        self.session.mark_stopped()
+        latency = self.session.stop_latency()
+        if latency is not None:
+            self.log(f"Session stopped in {latency:.3f}s")
+        self.events.post("session_stopped", -1.0 if latency is None else latency)
@@ -0,0 +1,232 @@
+import argparse
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+import records
+
+# SQLite index of every saved session, so recordings can be found without
+# scanning ./data or grepping the record logs. It is updated as each
+# recording is saved and can be rebuilt from the record logs at any time.
+CATALOG_FILE = './data/catalog.sqlite3'
+DATA_DIR = './data'
+CATALOG_VERSION = 1  # PRAGMA user_version; 1 stores dates as yyyyMMdd
+DATE_YEARS = range(2000, 2101)  # years a session date can have
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    file_id TEXT PRIMARY KEY,
+    school_name TEXT,
+    date TEXT,
+    name TEXT,
+    grade TEXT,
+    height TEXT,
+    gender TEXT,
+    exercise_name TEXT,
+    label TEXT,
+    filename TEXT,
+    rows INTEGER,
+    duration_s REAL,
+    sensors TEXT
+);
+CREATE TABLE IF NOT EXISTS sensor_stats (
+    file_id TEXT NOT NULL REFERENCES sessions(file_id) ON DELETE CASCADE,
+    sensor TEXT NOT NULL,
+    missing_samples INTEGER,
+    late_samples INTEGER,
+    reconnects INTEGER,
+    parse_errors INTEGER,
+    PRIMARY KEY (file_id, sensor)
+);
+CREATE INDEX IF NOT EXISTS sessions_school_exercise_label ON sessions (school_name, exercise_name, label);
+CREATE INDEX IF NOT EXISTS sessions_exercise_label ON sessions (exercise_name, label);
+CREATE INDEX IF NOT EXISTS sessions_date ON sessions (date);
+"""
+
+SESSION_FIELDS = ["file_id", "school_name", "date", "name", "grade", "height", "gender",
+                  "exercise_name", "label", "filename", "rows", "duration_s", "sensors"]
+SENSOR_FIELDS = ["missing_samples", "late_samples", "reconnects", "parse_errors"]
+
+
+def catalog_date(date):
+    # Records carry the ddMMyyyy date the app names its files with; the
+    # catalog keeps yyyyMMdd so the date index and ORDER BY date sort
+    # chronologically. yyyyMMdd is passed through, so queries can use either.
+    # Both layouts are eight digits, so a parse only counts with a year in
+    # DATE_YEARS: "20120312" is not the 20th of December 312.
+    if not date:
+        return date
+    for layout in ("%d%m%Y", "%Y%m%d", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(date, layout)
+        except ValueError:
+            continue
+        if parsed.year in DATE_YEARS:
+            return parsed.strftime("%Y%m%d")
+    return date
+
+
+def open_catalog(filename=CATALOG_FILE):
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(filename)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < CATALOG_VERSION:
+        # Catalogs written before dates were normalised
+        with conn:
+            dates = conn.execute("SELECT DISTINCT date FROM sessions").fetchall()
+            conn.executemany("UPDATE sessions SET date = ? WHERE date = ?",
+                             [(catalog_date(row[0]), row[0]) for row in dates if catalog_date(row[0]) != row[0]])
+            conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    return conn
+
+
+def _session_rows(record):
+    sensors = record.get("sensors") or {}
+    session = [",".join(sensors) if field == "sensors" else record.get(field) for field in SESSION_FIELDS]
+    session[SESSION_FIELDS.index("date")] = catalog_date(record.get("date"))
+    stats = [[record["file_id"], sensor] + [values.get(field) for field in SENSOR_FIELDS]
+             for sensor, values in sensors.items()]
+    return session, stats
+
+
+def _insert(conn, record):
+    session, stats = _session_rows(record)
+    conn.execute("DELETE FROM sensor_stats WHERE file_id = ?", (record["file_id"],))
+    conn.execute(f"INSERT OR REPLACE INTO sessions ({', '.join(SESSION_FIELDS)}) "
+                 f"VALUES ({', '.join('?' * len(SESSION_FIELDS))})", session)
+    conn.executemany(f"INSERT INTO sensor_stats (file_id, sensor, {', '.join(SENSOR_FIELDS)}) "
+                     f"VALUES ({', '.join('?' * (len(SENSOR_FIELDS) + 2))})", stats)
+
+
+def add_session(record, filename=CATALOG_FILE):
+    # Index one saved recording; called as each recording is saved
+    conn = open_catalog(filename)
+    try:
+        with conn:
+            _insert(conn, record)
+    finally:
+        conn.close()
+
+
+def find_data_file(record, data_dir=DATA_DIR):
+    if record.get("filename") and os.path.exists(record["filename"]):
+        return record["filename"]
+    for ext in (".csv", ".csv.gz", ".csv.zst", ".zrec"):
+        candidate = os.path.join(data_dir, f"{record['file_id']}_{record.get('exercise_name')}{ext}")
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _csv_rows(filename):
+    # Rows of a plain or compressed capture CSV, header first
+    if filename.endswith((".csv.gz", ".csv.zst")):
+        import compressed
+        yield from compressed.iter_rows(filename)
+        return
+    with open(filename, 'r', newline='') as f:
+        yield from csv.reader(f)
+
+
+def scan_data_file(filename):
+    # Row count and duration for recordings saved before the record carried them
+    if filename.endswith(".zrec"):
+        # Only binary recordings need numpy
+        import recording
+        data = recording.read_recording(filename)
+        timestamps = data.column("timestamp")
+        if len(timestamps) == 0:
+            return 0, 0.0
+        return len(timestamps), float(timestamps[-1] - timestamps[0]) / 1000
+    rows = 0
+    first = last = None
+    reader = _csv_rows(filename)
+    next(reader, None)
+    for row in reader:
+        if not row:
+            continue
+        rows += 1
+        try:
+            last = float(row[0])
+        except ValueError:
+            continue
+        if first is None:
+            first = last
+    if first is None:
+        return rows, 0.0
+    return rows, (last - first) / 1000
+
+
+def rebuild(filename=CATALOG_FILE, records_dir=records.RECORDS_DIR, data_dir=DATA_DIR):
+    # Re-index every record in the record logs, filling in row counts and
+    # durations from the data files where the record does not have them
+    conn = open_catalog(filename)
+    count = 0
+    try:
+        with conn:
+            conn.execute("DELETE FROM sensor_stats")
+            conn.execute("DELETE FROM sessions")
+            for records_file in records.record_files(records_dir):
+                for record in records.read_records_file(records_file):
+                    if not record.get("file_id"):
+                        continue
+                    record = dict(record)
+                    data_file = find_data_file(record, data_dir)
+                    if data_file is not None:
+                        record["filename"] = data_file
+                        if record.get("rows") is None:
+                            record["rows"], record["duration_s"] = scan_data_file(data_file)
+                    _insert(conn, record)
+                    count += 1
+    finally:
+        conn.close()
+    return count
+
+
+def find_sessions(conn, **filters):
+    # e.g. find_sessions(conn, school_name="X", exercise_name="Skipping", label="Good");
+    # date as ddMMyyyy or yyyyMMdd
+    for field in filters:
+        if field not in SESSION_FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+    if "date" in filters:
+        filters["date"] = catalog_date(filters["date"])
+    where = " AND ".join(f"{field} = ?" for field in filters) or "1"
+    return conn.execute(f"SELECT * FROM sessions WHERE {where} ORDER BY date, file_id",
+                        list(filters.values())).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session catalog over the data directory")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = commands.add_parser("rebuild", help="re-index all sessions from the record logs")
+    rebuild_parser.add_argument("--records-dir", default=records.RECORDS_DIR)
+    rebuild_parser.add_argument("--data-dir", default=DATA_DIR)
+    query = commands.add_parser("query", help="list sessions matching all given fields")
+    for field in ("school_name", "date", "grade", "gender", "exercise_name", "label"):
+        query.add_argument(f"--{field.replace('_', '-')}", dest=field,
+                           help="ddMMyyyy or yyyyMMdd" if field == "date" else None)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        print(f"Indexed {rebuild(args.catalog, args.records_dir, args.data_dir)} sessions")
+        return
+    filters = {field: value for field, value in vars(args).items()
+               if field in SESSION_FIELDS and value is not None}
+    conn = open_catalog(args.catalog)
+    try:
+        for row in find_sessions(conn, **filters):
+            print(f"{row['file_id']}  {row['date']}  {row['school_name']}  {row['exercise_name']}  "
+                  f"{row['label']}  {row['rows']} rows  {row['filename']}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import time
+
+import numpy as np
+
+from session_writer import SessionWriter
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is always available
+    zstandard = None
+
+# Compressed CSV recordings. The text is exactly what SessionWriter writes,
+# compressed in chunks on the writer thread, so the BLE loop never waits on
+# the compressor. Every chunk is a complete gzip member (or zstd frame): the
+# file is an ordinary .csv.gz / .csv.zst that gzip, zstd and pandas read
+# as is, each chunk decompresses on its own, and a file cut short by a crash
+# still reads up to its last complete chunk.
+#
+#   python compressed.py compress data/*.csv [--codec zstd] [--remove]
+#   python compressed.py decompress data/*.csv.gz
+#   python compressed.py info data/*.csv.gz
+EXTENSIONS = {".csv.gz": "gzip", ".csv.zst": "zstd"}
+CHUNK_BYTES = 256 * 1024  # uncompressed text per chunk
+CHUNK_SECONDS = 10.0  # a chunk is written at least this often, so a crash loses at most this much
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+BLOCK_ROWS = 4096  # rows per array from read_blocks
+
+
+def codec_for(filename):
+    for ext, codec in EXTENSIONS.items():
+        if filename.endswith(ext):
+            return codec
+    return None
+
+
+def split_extension(filename):
+    # ("data/x", ".csv.gz") for compressed recordings, os.path.splitext otherwise
+    for ext in EXTENSIONS:
+        if filename.endswith(ext):
+            return filename[:-len(ext)], ext
+    return os.path.splitext(filename)
+
+
+def _check_codec(codec):
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("zstd recordings need the zstandard package (pip install zstandard)")
+
+
+class _Compressor:
+    def __init__(self, codec):
+        _check_codec(codec)
+        self.codec = codec
+        self._zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if codec == "zstd" else None
+
+    def compress(self, data):
+        # One self-contained gzip member or zstd frame
+        if self._zstd is not None:
+            return self._zstd.compress(data)
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+class CompressedSessionWriter(SessionWriter):
+    # SessionWriter for .csv.gz and .csv.zst files; the codec follows the
+    # file extension. Rows are collected as CSV text and compressed once a
+    # chunk is CHUNK_BYTES long or CHUNK_SECONDS old.
+    def __init__(self, filename, columns, batch_size=50, flush_interval=0.5):
+        codec = codec_for(filename)
+        if codec is None:
+            raise ValueError(f"{filename} does not end in {' or '.join(EXTENSIONS)}")
+        self._compressor = _Compressor(codec)
+        self.text_bytes = 0
+        self.compressed_bytes = 0
+        self.chunks = 0
+        super().__init__(filename, columns, batch_size=batch_size, flush_interval=flush_interval)
+
+    def _open(self):
+        self._file = open(self.filename, 'wb')
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(self.columns)
+        self._chunk_started = time.monotonic()
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+        if self._text.tell() >= CHUNK_BYTES or time.monotonic() - self._chunk_started >= CHUNK_SECONDS:
+            self._write_chunk()
+
+    def _write_chunk(self):
+        data = self._text.getvalue().encode('utf-8')
+        self._text.seek(0)
+        self._text.truncate()
+        self._chunk_started = time.monotonic()
+        if not data:
+            return
+        chunk = self._compressor.compress(data)
+        self._file.write(chunk)
+        self.text_bytes += len(data)
+        self.compressed_bytes += len(chunk)
+        self.chunks += 1
+
+    def _finish(self):
+        self._write_chunk()
+
+
+def open_text(filename):
+    # A capture CSV as a text stream, decompressed as it is read
+    codec = codec_for(filename)
+    if codec == "gzip":
+        return gzip.open(filename, 'rt', newline='')
+    if codec == "zstd":
+        _check_codec(codec)
+        reader = zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'), read_across_frames=True,
+                                                            closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', newline='')
+    return open(filename, 'r', newline='')
+
+
+def _truncation_errors():
+    errors = (EOFError, gzip.BadGzipFile)
+    if zstandard is not None:
+        errors += (zstandard.ZstdError,)
+    return errors
+
+
+def iter_rows(filename):
+    # The header, then every complete row as a list of strings, for plain or
+    # compressed CSVs. A compressed file cut short ends at its last complete row.
+    with open_text(filename) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        try:
+            for row in reader:
+                if row:
+                    yield row
+        except _truncation_errors():
+            # Rows are only returned once their line ended, so everything
+            # yielded before the cut is whole
+            return
+
+
+def read_blocks(filename, block_rows=BLOCK_ROWS):
+    # (columns, blocks): blocks yields float arrays of up to block_rows rows,
+    # so a long session can be analysed without loading it whole
+    rows = iter_rows(filename)
+    columns = next(rows, [])
+
+    def blocks():
+        block = []
+        for row in rows:
+            if len(row) != len(columns):
+                continue
+            block.append(row)
+            if len(block) == block_rows:
+                yield np.array(block, dtype=float)
+                block = []
+        if block:
+            yield np.array(block, dtype=float)
+    return columns, blocks()
+
+
+def convert(filename, output, codec=None):
+    # Re-encode a capture CSV (plain or compressed) as plain or compressed
+    # text, streaming, in the writer's chunk size. Returns the row count.
+    rows = -1  # not counting the header
+    if codec is None:
+        with open(output, 'w', newline='') as out:
+            writer = csv.writer(out)
+            for row in iter_rows(filename):
+                writer.writerow(row)
+                rows += 1
+        return max(rows, 0)
+    compressor = _Compressor(codec)
+    text = io.StringIO()
+    writer = csv.writer(text)
+    with open(output, 'wb') as out:
+        for row in iter_rows(filename):
+            writer.writerow(row)
+            rows += 1
+            if text.tell() >= CHUNK_BYTES:
+                out.write(compressor.compress(text.getvalue().encode('utf-8')))
+                text.seek(0)
+                text.truncate()
+        if text.tell():
+            out.write(compressor.compress(text.getvalue().encode('utf-8')))
+    return max(rows, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress, decompress and inspect CSV recordings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compress = commands.add_parser("compress", help="write FILE.csv.gz (or .csv.zst) next to each CSV")
+    compress.add_argument("files", nargs="+")
+    compress.add_argument("--codec", choices=["gzip", "zstd"], default="gzip")
+    compress.add_argument("--remove", action="store_true", help="delete each CSV once compressed")
+    decompress = commands.add_parser("decompress", help="write the plain CSV next to each compressed file")
+    decompress.add_argument("files", nargs="+")
+    info = commands.add_parser("info", help="print rows, columns and sizes")
+    info.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    for filename in args.files:
+        base, ext = split_extension(filename)
+        if args.command == "compress":
+            if codec_for(filename):
+                print(f"{filename} is already compressed")
+                continue
+            output = base + {"gzip": ".csv.gz", "zstd": ".csv.zst"}[args.codec]
+            rows = convert(filename, output, args.codec)
+            print(f"{filename} -> {output}: {rows} rows, "
+                  f"{os.path.getsize(filename) / max(os.path.getsize(output), 1):.1f}x smaller")
+            if args.remove:
+                os.remove(filename)
+        elif args.command == "decompress":
+            if not codec_for(filename):
+                print(f"{filename} is not compressed")
+                continue
+            rows = convert(filename, base + ".csv")
+            print(f"{filename} -> {base}.csv: {rows} rows")
+        else:
+            rows = iter_rows(filename)
+            columns = next(rows, [])
+            count = sum(1 for _ in rows)
+            print(f"{filename}: {count} rows, {len(columns)} columns, {os.path.getsize(filename)} bytes")
+
+
+if __name__ == "__main__":
+    main()
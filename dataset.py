@@ -0,0 +1,281 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+import catalog
+import compressed
+import records
+from features import HOP_SECONDS, WINDOW_SECONDS
+
+# Training dataset from the saved sessions. Sessions come from the record
+# logs (label and student joined from the record), each data file is
+# resampled onto the 25 Hz grid a block at a time and cut into windows in a
+# process pool, and the windows are written as .npz shards per exercise and
+# split. Every session's windows are cached under the hash of its data file
+# and the build parameters, so a rebuild after a new school visit only
+# processes the new sessions.
+#
+#   python dataset.py build --output dataset [--labels Good] [--window 2 --hop 1] [--workers 4]
+#
+# Output layout:
+#   <output>/manifest.json                       parameters, columns, shards, sessions
+#   <output>/<exercise>/<split>-00000.npz        X (windows, samples, channels) float32,
+#                                                label, file_id, start_ms per window
+FREQUENCY_HZ = 25  # Grid the sessions are resampled to, as in capture.py
+SPLITS = (("train", 0.8), ("validation", 0.1), ("test", 0.1))
+SHARD_WINDOWS = 20000  # windows per shard file
+CACHE_VERSION = 1  # bump when the processing changes, to ignore old cache entries
+
+
+def discover_sessions(records_dir=records.RECORDS_DIR, data_dir=catalog.DATA_DIR, labels=None):
+    # One entry per file_id (the last record wins, as a relabel appends a
+    # new one) for every record whose data file can be found
+    sessions = {}
+    for records_file in records.record_files(records_dir):
+        for record in records.read_records_file(records_file):
+            if not record.get("file_id") or not record.get("label"):
+                continue
+            if record.get("complete") is False:
+                # The writer failed part way through
+                continue
+            if labels and record["label"] not in labels:
+                continue
+            sessions[record["file_id"]] = record
+    found = []
+    for record in sessions.values():
+        data_file = catalog.find_data_file(record, data_dir)
+        if data_file is None:
+            print(f"No data file for {record['file_id']} ({record.get('exercise_name')}), skipped")
+            continue
+        found.append((record, data_file))
+    found.sort(key=lambda item: (catalog.catalog_date(item[0].get("date", "")), item[0]["file_id"]))
+    return found
+
+
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_blocks(filename):
+    # (columns, blocks of rows) for CSV, compressed CSV and .zrec recordings
+    if filename.endswith(".zrec"):
+        import recording
+        data = recording.read_recording(filename)
+        return data.columns, iter([data.data])
+    return compressed.read_blocks(filename)
+
+
+def resample(blocks, period_ms):
+    # Linear interpolation of every column onto t0 + k * period_ms, where
+    # column 0 is the timestamp. Works a block at a time, carrying the last
+    # row over so the grid continues across block boundaries.
+    carry = None
+    next_time = None
+    for block in blocks:
+        if carry is not None:
+            block = np.vstack((carry, block))
+        if len(block) == 0:
+            continue
+        times = np.maximum.accumulate(block[:, 0])
+        if next_time is None:
+            next_time = times[0]
+        carry = block[-1:]
+        if len(block) < 2 or times[-1] < next_time:
+            continue
+        count = int((times[-1] - next_time) // period_ms) + 1
+        grid = next_time + np.arange(count) * period_ms
+        i = np.clip(np.searchsorted(times, grid, side='right') - 1, 0, len(times) - 2)
+        step = times[i + 1] - times[i]
+        weight = np.clip(np.where(step > 0, (grid - times[i]) / np.where(step > 0, step, 1.0), 0.0), 0.0, 1.0)
+        rows = block[i] + weight[:, None] * (block[i + 1] - block[i])
+        rows[:, 0] = grid
+        next_time = grid[-1] + period_ms
+        yield rows
+
+
+def process_session(task):
+    # Runs in a worker: resample and window one data file, or reuse the
+    # cached result. Returns a summary; the windows are in the cache file.
+    data_file, cache_dir, params = task
+    started = time.perf_counter()
+    key = hashlib.sha256(json.dumps([file_hash(data_file), params, CACHE_VERSION]).encode()).hexdigest()[:32]
+    cache_file = os.path.join(cache_dir, f"{key}.npz")
+    if os.path.exists(cache_file):
+        with np.load(cache_file) as cached:
+            windows = len(cached["start_ms"])
+        return {"data_file": data_file, "cache_file": cache_file, "cached": True, "windows": windows,
+                "seconds": time.perf_counter() - started}
+
+    columns, blocks = read_blocks(data_file)
+    period_ms = 1000 / params["frequency_hz"]
+    parts = list(resample(blocks, period_ms))
+    channels = [i for i, name in enumerate(columns) if name != "timestamp" and not name.endswith("_index")]
+    data = np.concatenate(parts) if parts else np.empty((0, len(columns)))
+    window = int(round(params["window_seconds"] * params["frequency_hz"]))
+    hop = int(round(params["hop_seconds"] * params["frequency_hz"]))
+    if len(data) >= window:
+        # (windows, channels, samples) view, every hop-th start, as (windows, samples, channels)
+        views = np.lib.stride_tricks.sliding_window_view(data[:, channels], window, axis=0)[::hop]
+        windows = np.ascontiguousarray(views.transpose(0, 2, 1), dtype=np.float32)
+        start_ms = data[::hop, 0][:len(windows)]
+    else:
+        windows = np.empty((0, window, len(channels)), dtype=np.float32)
+        start_ms = np.empty(0)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write under a temporary name so an interrupted build leaves no partial entry
+    temp_file = cache_file + f".{os.getpid()}.tmp.npz"
+    np.savez(temp_file, X=windows, start_ms=start_ms, columns=np.array([columns[i] for i in channels]))
+    os.replace(temp_file, cache_file)
+    return {"data_file": data_file, "cache_file": cache_file, "cached": False, "windows": len(windows),
+            "seconds": time.perf_counter() - started}
+
+
+def assign_split(record, splits=SPLITS):
+    # Stable per student, so one child's sessions never land in two splits
+    student = "|".join(str(record.get(field, "")) for field in ("school_name", "name", "grade"))
+    if not student.strip("|"):
+        student = record["file_id"]
+    position = int(hashlib.sha256(student.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+    total = 0.0
+    for name, fraction in splits:
+        total += fraction
+        if position <= total:
+            return name
+    return splits[-1][0]
+
+
+def slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()
+
+
+class ShardWriter:
+    # Collects windows of one exercise and split and writes them out
+    # SHARD_WINDOWS at a time
+    def __init__(self, directory, split, shard_windows=SHARD_WINDOWS):
+        self.directory = directory
+        self.split = split
+        self.shard_windows = shard_windows
+        self.parts = []
+        self.pending = 0
+        self.files = []
+
+    def add(self, windows, label, file_id, start_ms):
+        if len(windows) == 0:
+            return
+        self.parts.append((windows, np.full(len(windows), label), np.full(len(windows), file_id), start_ms))
+        self.pending += len(windows)
+        if self.pending >= self.shard_windows:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        filename = os.path.join(self.directory, f"{self.split}-{len(self.files):05d}.npz")
+        np.savez(filename, X=np.concatenate([p[0] for p in self.parts]),
+                 label=np.concatenate([p[1] for p in self.parts]),
+                 file_id=np.concatenate([p[2] for p in self.parts]),
+                 start_ms=np.concatenate([p[3] for p in self.parts]))
+        self.files.append(filename)
+        self.parts = []
+        self.pending = 0
+
+
+def _remove_previous(output):
+    # Shards of an earlier build, as listed in its manifest
+    manifest_file = os.path.join(output, "manifest.json")
+    if not os.path.exists(manifest_file):
+        return
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+    for exercise in manifest.get("exercises", {}).values():
+        for files in exercise.get("shards", {}).values():
+            for filename in files:
+                path = os.path.join(output, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def build(output, records_dir=records.RECORDS_DIR, data_dir=catalog.DATA_DIR, cache_dir=None, labels=None,
+          window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS, frequency_hz=FREQUENCY_HZ, workers=None,
+          shard_windows=SHARD_WINDOWS):
+    cache_dir = cache_dir or os.path.join(data_dir, "dataset_cache")
+    params = {"frequency_hz": frequency_hz, "window_seconds": window_seconds, "hop_seconds": hop_seconds}
+    sessions = discover_sessions(records_dir, data_dir, labels)
+    print(f"{len(sessions)} sessions")
+    started = time.perf_counter()
+    tasks = [(data_file, cache_dir, params) for _, data_file in sessions]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(process_session, tasks, chunksize=max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))))
+    processed = sum(1 for r in results if not r["cached"])
+    print(f"Processed {processed} sessions, {len(results) - processed} from cache, "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    _remove_previous(output)
+    writers = {}
+    exercises = {}
+    manifest_sessions = []
+    for (record, data_file), result in zip(sessions, results):
+        exercise = record.get("exercise_name", "unknown")
+        split = assign_split(record)
+        with np.load(result["cache_file"]) as cached:
+            columns = cached["columns"].tolist()
+            if exercises.setdefault(exercise, {"columns": columns})["columns"] != columns:
+                print(f"{data_file} has different columns than the other {exercise} sessions, skipped")
+                continue
+            if (exercise, split) not in writers:
+                writers[(exercise, split)] = ShardWriter(os.path.join(output, slug(exercise)), split, shard_windows)
+            writers[(exercise, split)].add(cached["X"], record["label"], record["file_id"], cached["start_ms"])
+        manifest_sessions.append({"file_id": record["file_id"], "exercise_name": exercise, "label": record["label"],
+                                  "split": split, "windows": result["windows"], "data_file": data_file})
+
+    for (exercise, split), writer in writers.items():
+        writer.flush()
+        exercises[exercise].setdefault("shards", {})[split] = [os.path.relpath(f, output) for f in writer.files]
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "params": dict(params, splits=dict(SPLITS)),
+        "labels": sorted({s["label"] for s in manifest_sessions}),
+        "exercises": exercises,
+        "sessions": manifest_sessions,
+    }
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, "manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    windows = sum(s["windows"] for s in manifest_sessions)
+    print(f"Wrote {windows} windows from {len(manifest_sessions)} sessions to {output}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a windowed training dataset from the saved sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="resample, window and shard every labelled session")
+    build_parser.add_argument("--output", default="dataset")
+    build_parser.add_argument("--records-dir", default=records.RECORDS_DIR)
+    build_parser.add_argument("--data-dir", default=catalog.DATA_DIR)
+    build_parser.add_argument("--cache-dir", help="default: <data-dir>/dataset_cache")
+    build_parser.add_argument("--labels", nargs="+", help="only sessions with these labels (default: all)")
+    build_parser.add_argument("--window", type=float, default=WINDOW_SECONDS, help="window length in seconds")
+    build_parser.add_argument("--hop", type=float, default=HOP_SECONDS, help="seconds between window starts")
+    build_parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    build_parser.add_argument("--shard-windows", type=int, default=SHARD_WINDOWS)
+    args = parser.parse_args()
+
+    build(args.output, args.records_dir, args.data_dir, args.cache_dir, args.labels, args.window, args.hop,
+          workers=args.workers, shard_windows=args.shard_windows)
+
+
+if __name__ == "__main__":
+    main()
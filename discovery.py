@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+# Last known address of each sensor, keyed by advertised name
+ADDRESS_CACHE_FILE = 'sensor_addresses.json'
+
+
+def load_address_cache(filename=ADDRESS_CACHE_FILE):
+    try:
+        with open(filename, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_address_cache(cache, filename=ADDRESS_CACHE_FILE):
+    with open(filename, 'w') as f:
+        json.dump(cache, f, indent=4)
+
+
+async def discover_sensors(sensors, sensor_ids, timeout=10.0):
+    # Scan only for the UART services of the requested sensors and return as
+    # soon as all of them have been seen, instead of waiting out the full
+    # scan. `sensors` is the UART_SERVICE_UUIDS list; returns
+    # {sensor_id: BLEDevice} for the sensors that were found in time.
+    # bleak is imported here so the address cache works without it.
+    from bleak import BleakScanner
+    by_service = {sensors[i - 1][1].lower(): i for i in sensor_ids}
+    by_name = {sensors[i - 1][0]: i for i in sensor_ids}
+    found = {}
+    all_found = asyncio.Event()
+
+    def on_detection(device, advertisement):
+        sensor_id = None
+        for uuid in advertisement.service_uuids:
+            sensor_id = by_service.get(uuid.lower())
+            if sensor_id is not None:
+                break
+        if sensor_id is None:
+            # Some stacks only report the UUID in the scan response
+            sensor_id = by_name.get(advertisement.local_name or device.name)
+        if sensor_id is not None and sensor_id not in found:
+            found[sensor_id] = device
+            if len(found) == len(by_name):
+                all_found.set()
+
+    async with BleakScanner(detection_callback=on_detection, service_uuids=list(by_service)):
+        try:
+            await asyncio.wait_for(all_found.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    return found
@@ -0,0 +1,449 @@
+# Exercise and sensor definitions shared by the GUI (main3.py) and the
+# headless capture (zoommer.py). Kept free of Qt and bleak imports.
+
+# Load exercise configuration from a JSON file
+EXERCISE_CONFIG = {
+    "Dribbling in Figure 8": {
+      "sensors": [1, 2, 3, 4, 5],
+      "columns": [
+        "timestamp",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z",
+        "ball_Accel_X",
+        "ball_Accel_Y",
+        "ball_Accel_Z",
+        "ball_Gyro_X",
+        "ball_Gyro_Y",
+        "ball_Gyro_Z"
+      ]
+    },
+    "Dribbling in Figure O": {
+      "sensors": [1, 2, 3, 4, 5],
+      "columns": [
+        "timestamp",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z",
+        "ball_Accel_X",
+        "ball_Accel_Y",
+        "ball_Accel_Z",
+        "ball_Gyro_X",
+        "ball_Gyro_Y",
+        "ball_Gyro_Z"
+      ]
+    },
+    "Large Ball Bounce and Catch": {
+      "sensors": [1, 2, 5],
+      "columns": [
+        "timestamp",
+        "right_hand_index",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_index",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "ball_index",
+        "ball_Accel_X",
+        "ball_Accel_Y",
+        "ball_Accel_Z",
+        "ball_Gyro_X",
+        "ball_Gyro_Y",
+        "ball_Gyro_Z"
+      ]
+    },
+    "Hit Balloon Up": {
+      "sensors": [1, 2],
+      "columns": [
+        "timestamp",
+        "right_hand_index",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_index",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z"
+      ]
+    },
+    "Jumping Jack with Clap": {
+      "sensors": [1, 2, 3, 4],
+      "columns": [
+        "timestamp",
+        "right_hand_index",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_index",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "right_leg_index",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_index",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Forward Backward Spread Legs and Back": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Criss Cross with Clapping": {
+      "sensors": [1, 2, 3, 4],
+      "columns": [
+        "timestamp",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Criss Cross without Clapping": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Criss Cross (leg forward)": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Alternate Feet Forward Backward": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Skipping": {
+      "sensors": [1, 2, 3, 4],
+      "columns": [
+        "timestamp",
+        "right_hand_Accel_X",
+        "right_hand_Accel_Y",
+        "right_hand_Accel_Z",
+        "right_hand_Gyro_X",
+        "right_hand_Gyro_Y",
+        "right_hand_Gyro_Z",
+        "left_hand_Accel_X",
+        "left_hand_Accel_Y",
+        "left_hand_Accel_Z",
+        "left_hand_Gyro_X",
+        "left_hand_Gyro_Y",
+        "left_hand_Gyro_Z",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Jumping Jack without Hands": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Jump with feet symmetrically": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Jump with feet asymmetrically": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Hop between lines": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Hopping forward one one leg": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Step down from height": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Step over an obstacle": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    },
+    "Stand on one leg": {
+      "sensors": [3, 4],
+      "columns": [
+        "timestamp",
+        "right_leg_Accel_X",
+        "right_leg_Accel_Y",
+        "right_leg_Accel_Z",
+        "right_leg_Gyro_X",
+        "right_leg_Gyro_Y",
+        "right_leg_Gyro_Z",
+        "left_leg_Accel_X",
+        "left_leg_Accel_Y",
+        "left_leg_Accel_Z",
+        "left_leg_Gyro_X",
+        "left_leg_Gyro_Y",
+        "left_leg_Gyro_Z"
+      ]
+    }
+  }
+
+# UUIDs and other data
+UART_SERVICE_UUIDS = [
+    ("Sense Right Hand", "8E400004-B5A3-F393-E0A9-E50E24DCCA9E", "8E400006-B5A3-F393-E0A9-E50E24DCCA9E"),
+    ("Sense Left Hand", "6E400001-B5A3-F393-E0A9-E50E24DCCA9E", "6E400003-B5A3-F393-E0A9-E50E24DCCA9E"),
+    ("Sense Right Leg", "7E400001-A5B3-C393-D0E9-F50E24DCCA9E", "7E400003-A5B3-C393-D0E9-F50E24DCCA9E"),
+    ("Sense Left Leg", "6E400001-B5C3-D393-A0F9-E50F24DCCA9E", "6E400003-B5C3-D393-A0F9-E50F24DCCA9E"),
+    ("Sense Ball", "9E400001-C5C3-E393-B0A9-E50E24DCCA9E", "9E400003-C5C3-E393-B0A9-E50E24DCCA9E"),
+]
+
+
+def column_prefix(name):
+    # "Sense Right Hand" -> "right_hand", as used in the EXERCISE_CONFIG columns
+    return name.lower().replace("sense ", "", 1).replace(" ", "_")
@@ -0,0 +1,114 @@
+import numpy as np
+
+# Rolling features computed while recording, from the aligned frames that go
+# to the writer, so the nightly batch no longer re-reads every session. Each
+# tracked series (the six IMU axes of every sensor plus its accelerometer
+# and gyroscope magnitude and jerk) keeps running sums over a sliding window,
+# so a frame costs the same whatever the window length. Every `hop` frames
+# one feature row is emitted: mean and standard deviation of every series,
+# and the energy of the magnitudes in a few frequency bands from one batched
+# FFT over the window.
+WINDOW_SECONDS = 2.0
+HOP_SECONDS = 1.0
+BANDS_HZ = ((0.5, 3.0), (3.0, 6.0), (6.0, 12.5))  # FFT band energy of the magnitudes
+RESUM_EVERY = 100  # hops between exact re-sums, so rounding error cannot build up
+AXES = ["Accel_X", "Accel_Y", "Accel_Z", "Gyro_X", "Gyro_Y", "Gyro_Z"]
+DERIVED = ["Accel_Mag", "Gyro_Mag", "Jerk"]
+
+
+def sensor_prefixes(columns):
+    # "right_hand" etc., in column order, for every sensor with all six axes
+    return [name[:-len("_Accel_X")] for name in columns
+            if name.endswith("_Accel_X") and all(f"{name[:-len('_Accel_X')]}_{axis}" in columns for axis in AXES)]
+
+
+class FeatureExtractor:
+    # `columns` are the recording's columns (an EXERCISE_CONFIG entry), the
+    # rows pushed are the rows written under them
+    def __init__(self, columns, frequency_hz, window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS,
+                 bands=BANDS_HZ):
+        self.frequency_hz = frequency_hz
+        self.window = max(2, int(round(window_seconds * frequency_hz)))
+        self.hop = max(1, int(round(hop_seconds * frequency_hz)))
+        self.prefixes = sensor_prefixes(columns)
+        columns = list(columns)
+        self.positions = [columns.index(f"{prefix}_{axis}") for prefix in self.prefixes for axis in AXES]
+        self.series = [f"{prefix}_{name}" for prefix in self.prefixes for name in AXES + DERIVED]
+        count = len(self.prefixes)
+        # FFT bins of each band, and which series are magnitudes
+        frequencies = np.fft.rfftfreq(self.window, 1 / frequency_hz)
+        self.bands = [(low, high, (frequencies >= low) & (frequencies < high)) for low, high in bands]
+        self.magnitudes = [i * 9 + 6 + k for i in range(count) for k in (0, 1)]
+        self.columns = (["timestamp"] +
+                        [f"{name}_{stat}" for name in self.series for stat in ("mean", "std")] +
+                        [f"{self.series[m]}_band_{low:g}_{high:g}Hz" for m in self.magnitudes
+                         for low, high, _ in self.bands])
+
+        self.ring = np.zeros((self.window, len(self.series)))
+        self.sums = np.zeros(len(self.series))
+        self.squares = np.zeros(len(self.series))
+        self.frames = 0
+        self.hops = 0
+        self.held = 0  # missing values replaced by the previous one
+        self._previous = None  # last frame's axes, to fill gaps and take the jerk
+        self.latest = {}  # last feature row by column name, for live displays
+
+    def _frame(self, row):
+        axes = np.array(row, dtype=float)[self.positions]
+        missing = np.isnan(axes)
+        if missing.any():
+            self.held += int(missing.sum())
+            axes[missing] = 0.0 if self._previous is None else self._previous[missing]
+        per_sensor = axes.reshape(-1, 6)
+        accel = np.sqrt((per_sensor[:, :3] ** 2).sum(axis=1))
+        gyro = np.sqrt((per_sensor[:, 3:] ** 2).sum(axis=1))
+        if self._previous is None:
+            jerk = np.zeros(len(per_sensor))
+        else:
+            change = per_sensor[:, :3] - self._previous.reshape(-1, 6)[:, :3]
+            jerk = np.sqrt((change ** 2).sum(axis=1)) * self.frequency_hz
+        self._previous = axes
+        return np.hstack((per_sensor, accel[:, None], gyro[:, None], jerk[:, None])).ravel()
+
+    def push(self, row):
+        # Add one aligned row; returns a feature row every hop once the window is full
+        values = self._frame(row)
+        slot = self.frames % self.window
+        if self.frames >= self.window:
+            outgoing = self.ring[slot]
+            self.sums -= outgoing
+            self.squares -= outgoing * outgoing
+        self.ring[slot] = values
+        self.sums += values
+        self.squares += values * values
+        self.frames += 1
+        if self.frames < self.window or (self.frames - self.window) % self.hop:
+            return None
+        return self._emit(row[0])
+
+    def _emit(self, timestamp):
+        self.hops += 1
+        if self.hops % RESUM_EVERY == 0:
+            self.sums = self.ring.sum(axis=0)
+            self.squares = (self.ring * self.ring).sum(axis=0)
+        mean = self.sums / self.window
+        std = np.sqrt(np.maximum(self.squares / self.window - mean * mean, 0.0))
+        # Oldest frame first, so the FFT sees the window in time order
+        start = self.frames % self.window
+        window = np.roll(self.ring[:, self.magnitudes], -start, axis=0)
+        spectrum = np.abs(np.fft.rfft(window - window.mean(axis=0), axis=0)) ** 2 / self.window
+        energy = [spectrum[mask, i].sum() for i in range(len(self.magnitudes)) for _, _, mask in self.bands]
+        features = [round(timestamp, 3)]
+        for m, s in zip(mean.tolist(), std.tolist()):
+            features.extend((round(m, 4), round(s, 4)))
+        features.extend(round(float(e), 4) for e in energy)
+        self.latest = dict(zip(self.columns, features))
+        return features
+
+    def summary(self, prefix):
+        # A short line for a live display, e.g. "|a| 9.81±0.42 |g| 12 jerk 4"
+        latest = self.latest
+        if f"{prefix}_Accel_Mag_mean" not in latest:
+            return ""
+        return (f"|a| {latest[f'{prefix}_Accel_Mag_mean']:.2f}±{latest[f'{prefix}_Accel_Mag_std']:.2f} "
+                f"|g| {latest[f'{prefix}_Gyro_Mag_mean']:.0f} jerk {latest[f'{prefix}_Jerk_mean']:.0f}")
@@ -0,0 +1,34 @@
+class LineFramer:
+    # Reassembles newline-terminated records from a sensor's BLE notifications.
+    # Raw bytes are appended to one reusable bytearray; each feed() looks for
+    # the last newline once, hands back every complete record in a single
+    # split and keeps only the trailing partial record for the next packet.
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def reset(self):
+        del self._buffer[:]
+
+    def feed_block(self, data):
+        # Return all complete records in `data` (plus any carried-over partial
+        # record) as one bytes block without its final newline, or b"" if the
+        # packet did not complete a record
+        buffer = self._buffer
+        buffer += data
+        end = buffer.rfind(b'\n')
+        if end < 0:
+            return b""
+        with memoryview(buffer) as view:
+            block = bytes(view[:end])
+        del buffer[:end + 1]
+        return block
+
+    def feed(self, data):
+        # Return the complete records as a list of bytes lines
+        block = self.feed_block(data)
+        if not block:
+            return []
+        return block.split(b'\n')
@@ -0,0 +1,76 @@
+import asyncio
+from collections import deque
+
+OVERFLOW_POLICIES = ("drop-oldest", "count-and-drop")
+
+
+class IngestQueue:
+    # Bounded, ordered hand-off between one sensor's BLE notification callback
+    # and a single consumer coroutine. The callback only appends to a deque,
+    # so no task is created per packet and packets of a sensor are always
+    # processed in arrival order. The consumer takes everything that queued
+    # up since it last ran and hands it to `handler(sensor_id, packets)` in
+    # one call, so a busy loop parses bigger batches instead of falling behind.
+    #
+    # When the queue is full:
+    #   drop-oldest    evicts the oldest packet to make room
+    #   count-and-drop discards the new packet
+    # There is no blocking policy: the BLE callback cannot wait, so the
+    # queue never holds more than maxsize packets.
+    def __init__(self, sensor_id, handler, maxsize=256, policy="drop-oldest"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.sensor_id = sensor_id
+        self.handler = handler
+        self.maxsize = maxsize
+        self.policy = policy
+        self.received = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+        self._packets = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    @property
+    def depth(self):
+        return len(self._packets)
+
+    def offer(self, data):
+        # Called from the notification callback; never waits
+        self.received += 1
+        if len(self._packets) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == "count-and-drop":
+                return False
+            self._packets.popleft()
+        self._packets.append(data)
+        self.max_depth = max(self.max_depth, len(self._packets))
+        self._ready.set()
+        return True
+
+    def close(self):
+        # Let the consumer finish what is queued and then return
+        self._closed = True
+        self._ready.set()
+
+    async def run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            if self._packets:
+                packets = list(self._packets)
+                self._packets.clear()
+                self.handler(self.sensor_id, packets)
+            if self._closed and not self._packets:
+                return
+            # Give the callbacks a chance to queue more before the next batch
+            await asyncio.sleep(0)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+        }
@@ -1,598 +1,47 @@
 import sys
 import os
-import csv
-import asyncio
-import json
-from datetime import datetime
-from bleak import BleakScanner, BleakClient
 from PyQt5.QtWidgets import (QApplication, QWizard, QWizardPage, QLabel, QLineEdit, QVBoxLayout, QDateEdit, QPushButton, QComboBox, QMessageBox, QInputDialog)
-from PyQt5.QtCore import QDate, QThread, pyqtSignal, QTimer, QObject
-import hashlib
-import time
-import string
-import random
-
-# Load exercise configuration from a JSON file
-EXERCISE_CONFIG = {
-    "Dribbling in Figure 8": {
-      "sensors": [1, 2, 3, 4, 5],
-      "columns": [
-        "timestamp",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z",
-        "ball_Accel_X",
-        "ball_Accel_Y",
-        "ball_Accel_Z",
-        "ball_Gyro_X",
-        "ball_Gyro_Y",
-        "ball_Gyro_Z"
-      ]
-    },
-    "Dribbling in Figure O": {
-      "sensors": [1, 2, 3, 4, 5],
-      "columns": [
-        "timestamp",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z",
-        "ball_Accel_X",
-        "ball_Accel_Y",
-        "ball_Accel_Z",
-        "ball_Gyro_X",
-        "ball_Gyro_Y",
-        "ball_Gyro_Z"
-      ]
-    },
-    "Large Ball Bounce and Catch": {
-      "sensors": [1, 2, 5],
-      "columns": [
-        "timestamp",
-        "right_hand_index",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_index",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "ball_index",
-        "ball_Accel_X",
-        "ball_Accel_Y",
-        "ball_Accel_Z",
-        "ball_Gyro_X",
-        "ball_Gyro_Y",
-        "ball_Gyro_Z"
-      ]
-    },
-    "Hit Balloon Up": {
-      "sensors": [1, 2],
-      "columns": [
-        "timestamp",
-        "right_hand_index",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_index",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z"
-      ]
-    },
-    "Jumping Jack with Clap": {
-      "sensors": [1, 2, 3, 4],
-      "columns": [
-        "timestamp",
-        "right_hand_index",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_index",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "right_leg_index",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_index",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Forward Backward Spread Legs and Back": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Criss Cross with Clapping": {
-      "sensors": [1, 2, 3, 4],
-      "columns": [
-        "timestamp",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Criss Cross without Clapping": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Criss Cross (leg forward)": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Alternate Feet Forward Backward": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Skipping": {
-      "sensors": [1, 2, 3, 4],
-      "columns": [
-        "timestamp",
-        "right_hand_Accel_X",
-        "right_hand_Accel_Y",
-        "right_hand_Accel_Z",
-        "right_hand_Gyro_X",
-        "right_hand_Gyro_Y",
-        "right_hand_Gyro_Z",
-        "left_hand_Accel_X",
-        "left_hand_Accel_Y",
-        "left_hand_Accel_Z",
-        "left_hand_Gyro_X",
-        "left_hand_Gyro_Y",
-        "left_hand_Gyro_Z",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Jumping Jack without Hands": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Jump with feet symmetrically": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Jump with feet asymmetrically": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Hop between lines": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Hopping forward one one leg": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Step down from height": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Step over an obstacle": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    },
-    "Stand on one leg": {
-      "sensors": [3, 4],
-      "columns": [
-        "timestamp",
-        "right_leg_Accel_X",
-        "right_leg_Accel_Y",
-        "right_leg_Accel_Z",
-        "right_leg_Gyro_X",
-        "right_leg_Gyro_Y",
-        "right_leg_Gyro_Z",
-        "left_leg_Accel_X",
-        "left_leg_Accel_Y",
-        "left_leg_Accel_Z",
-        "left_leg_Gyro_X",
-        "left_leg_Gyro_Y",
-        "left_leg_Gyro_Z"
-      ]
-    }
-  }
-
-# UUIDs and other data
-UART_SERVICE_UUIDS = [
-    ("Sense Right Hand", "8E400004-B5A3-F393-E0A9-E50E24DCCA9E", "8E400006-B5A3-F393-E0A9-E50E24DCCA9E"),
-    ("Sense Left Hand", "6E400001-B5A3-F393-E0A9-E50E24DCCA9E", "6E400003-B5A3-F393-E0A9-E50E24DCCA9E"),
-    ("Sense Right Leg", "7E400001-A5B3-C393-D0E9-F50E24DCCA9E", "7E400003-A5B3-C393-D0E9-F50E24DCCA9E"),
-    ("Sense Left Leg", "6E400001-B5C3-D393-A0F9-E50F24DCCA9E", "6E400003-B5C3-D393-A0F9-E50F24DCCA9E"),
-    ("Sense Ball", "9E400001-C5C3-E393-B0A9-E50E24DCCA9E", "9E400003-C5C3-E393-B0A9-E50E24DCCA9E"),
-]
-buffers = {i: "" for i in range(1, 6)}
-start_times = {i: None for i in range(1, 6)}
-sensor_data = {i: {"timestamp": None, "values": [None] * 6} for i in range(1, 6)}
-
-csv_filename = ""
-STOP_FLAG = False
-error_counter = 0
-MAX_ERRORS = 4
-
-def generate_hashed_id(info):
-    # Generate a random string
-    random_str = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-
-    # Get the current timestamp
-    timestamp = str(time.time())
-
-    # Combine the information with the random string and timestamp
-    input_str = f"{info}_{random_str}_{timestamp}"
-
-    # Generate the hash
-    hash_object = hashlib.sha256(input_str.encode('utf-8'))
-    return hash_object.hexdigest()[:20]  # Use the first 20 characters of the hash
-
-# Function to append the new record to the exercise JSON file
-def append_to_exercise_record(date, record):
-    filename = f'exercise_records_{date}.json'
-    try:
-        with open(filename, 'r') as f:
-            records = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        records = []
-
-    records.append(record)
-    with open(filename, 'w') as f:
-        json.dump(records, f, indent=4)
-
-# Define global variable for selected exercise configuration
-selected_exercise_config = None
-
-class GuiUpdater(QObject):
-    showMessageSignal = pyqtSignal(str)
-    stopExerciseSignal = pyqtSignal()
-    stopForErrorsSignal = pyqtSignal(str)
-
-    def __init__(self):
-        super().__init__()
-
-    def show_message(self, message):
-        msgBox = QMessageBox()
-        msgBox.setText(message)
-        msgBox.exec()
-
-    def stop_exercise(self):
-        ex.stopExercise()
-
-gui_updater = GuiUpdater()
-gui_updater.showMessageSignal.connect(gui_updater.show_message)
-gui_updater.stopExerciseSignal.connect(gui_updater.stop_exercise)
-gui_updater.stopForErrorsSignal.connect(gui_updater.show_message)
-
-async def notification_handler(sender, data, sensor_id):
-    global buffers, start_times, STOP_FLAG, error_counter, selected_exercise_config
-    if STOP_FLAG:
-        return
-    if start_times[sensor_id] is None:
-        start_times[sensor_id] = datetime.now()
-    buffers[sensor_id] += data.decode('utf-8')
-    buffer = buffers[sensor_id]
-    while '\n' in buffer:
-        line, buffer = buffer.split('\n', 1)
-        buffers[sensor_id] = buffer
-        if line.strip() == "":
-            continue
-        try:
-            parts = line.split(',')
-            if len(parts) != 7:
-                raise ValueError(f"Incorrect number of values: {len(parts)}. Received line: {line}")
-            imu_values = list(map(float, parts))
-            elapsed_time = (datetime.now() - start_times[sensor_id]).total_seconds() * 1000
-            sensor_data[sensor_id]["timestamp"] = elapsed_time
-            sensor_data[sensor_id]["values"] = imu_values
-            if all(sensor_data[i]["timestamp"] is not None and sensor_data[i]["values"][0] is not None for i in selected_exercise_config["sensors"]):
-                timestamp = round(sensor_data[selected_exercise_config["sensors"][0]]["timestamp"], 3)
-                row = [timestamp] + sum((sensor_data[i]["values"] for i in selected_exercise_config["sensors"]), [])
-                if len(row) != len(selected_exercise_config["columns"]):
-                    raise ValueError("Row has an incorrect number of values")
-                with open(csv_filename, 'a', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(row)
-                for i in selected_exercise_config["sensors"]:
-                    sensor_data[i]["timestamp"] = None
-                    sensor_data[i]["values"] = [None] * 7
-        except ValueError as e:
-            error_counter += 1
-            print(f"Error: {e}. Received line: {line}")
-            if error_counter >= MAX_ERRORS:
-                QTimer.singleShot(0, gui_updater.stopExerciseSignal.emit)
-                QTimer.singleShot(0, lambda: gui_updater.stopForErrorsSignal.emit("Bad data, stop and restart"))
-
-async def connect_to_sensor(device, sensor_id, char_uuid):
-    async with BleakClient(device) as client:
-        if client.is_connected:
-            print(f"Connected to {device.name}")
-            await client.start_notify(char_uuid, lambda sender, data: asyncio.create_task(notification_handler(sender, data, sensor_id)))
-            while not STOP_FLAG:
-                await asyncio.sleep(0.1)
-
-async def scan_and_connect():
-    tasks = []
-    devices = await BleakScanner.discover()
-    connected_sensors = []
-    for sensor in selected_exercise_config["sensors"]:
-        name, service_uuid, char_uuid = UART_SERVICE_UUIDS[sensor-1]
-        for device in devices:
-            if device.name == name:
-                tasks.append(connect_to_sensor(device, sensor, char_uuid))
-                connected_sensors.append(name)
-                break
-    gui_updater.showMessageSignal.emit(f"Connected to: {', '.join(connected_sensors)}")
-    await asyncio.gather(*tasks)
-
-
-class AsyncRunner(QThread):
-    updateStatus = pyqtSignal(str)
-    sensorsConnected = pyqtSignal()
-
-    async def scan_and_connect(self):
-        await scan_and_connect()
-        self.sensorsConnected.emit()
-        self.updateStatus.emit("Sensors connected")
-
-    def run(self):
-        global STOP_FLAG
-        STOP_FLAG = False
-        self.updateStatus.emit("Connecting to sensors...")
-        asyncio.run(self.scan_and_connect())
-
-    def stop(self):
-        global STOP_FLAG
-        STOP_FLAG = True
+from PyQt5.QtCore import QDate, QTimer
+from PyQt5.QtGui import QFontDatabase
+from capture import Capture, FREQUENCY_HZ, create_writer, new_record
+from preview import SignalPreview, SignalRing
+from bridge import GuiBridge
+from ble_manager import create_ble_manager
+from exercises import EXERCISE_CONFIG, UART_SERVICE_UUIDS
+
+RECORDING_FORMAT = "csv"  # csv, csv.gz / csv.zst (compressed, see compressed.py), or binary for .zrec files
+# Sensor backend: ble, simulated (generated data) or replay (plays back the
+# recording named by ZOOMMER_REPLAY at ZOOMMER_REPLAY_SPEED times real time)
+SENSOR_TRANSPORT = os.environ.get("ZOOMMER_TRANSPORT", "ble")
+PREVIEW_SECONDS = 10  # Signal history shown in the live preview
+PREVIEW_FPS = 10  # Most preview redraws per second
+GUI_TICK_MS = 50  # How often the GUI picks up events from the capture loop
+TELEMETRY_COLUMNS = 90  # Characters per sensor line of SessionTelemetry.panel_text
+MAX_SENSORS = max(len(config["sensors"]) for config in EXERCISE_CONFIG.values())
+
+def transport_options(kind):
+    if kind == "replay":
+        return {"filename": os.environ["ZOOMMER_REPLAY"],
+                "speed": float(os.environ.get("ZOOMMER_REPLAY_SPEED", "1"))}
+    return {}
+
+# Owns the sensor connections for the lifetime of the app
+ble_manager = create_ble_manager(SENSOR_TRANSPORT, UART_SERVICE_UUIDS, **transport_options(SENSOR_TRANSPORT))
+
+def show_message(message):
+    msgBox = QMessageBox()
+    msgBox.setText(message)
+    msgBox.exec()
+
+# Everything the capture loop has to tell the GUI goes through the bridge:
+#   "message"         dialog text, one dialog per event
+#   "abort"           stop the exercise because of bad data
+#   "session_stopped" the recording is on disk, value is the stop latency
+#   "status"          status line text (coalesced)
+#   "error"           latest parse error (coalesced)
+#   "metrics"         new telemetry to show (coalesced)
+gui_bridge = GuiBridge(interval_ms=GUI_TICK_MS)
+gui_bridge.subscribe("message", show_message)
 
 class StartPage(QWizardPage):
     def __init__(self, parent=None):
@@ -651,7 +100,8 @@ class MainPage(QWizardPage):
 
     def initUI(self):
         self.layout = QVBoxLayout()
-        self.setFixedSize(500, 500)
+        # Not fixed: the page is laid out around a telemetry panel and preview
+        # with room for the exercise with the most sensors
 
         self.name_label = QLabel("Name:")
         self.name_input = QLineEdit()
@@ -680,10 +130,7 @@ class MainPage(QWizardPage):
         self.layout.addWidget(self.exercise_name_label)
         self.layout.addWidget(self.exercise_name_dropdown)
 
-        self.status_label = QLabel("")
-        self.layout.addWidget(self.status_label)
-        self.timer_label = QLabel("Elapsed Time: 0s")
-        self.layout.addWidget(self.timer_label)
+        # Above the live displays, so they stay in reach on a short screen
         self.start_button = QPushButton('Start Exercise', self)
         self.start_button.clicked.connect(self.startExercise)
         self.layout.addWidget(self.start_button)
@@ -691,71 +138,110 @@ class MainPage(QWizardPage):
         self.stop_button.clicked.connect(self.stopExercise)
         self.stop_button.setEnabled(False)
         self.layout.addWidget(self.stop_button)
+
+        self.status_label = QLabel("")
+        self.layout.addWidget(self.status_label)
+        self.timer_label = QLabel("Elapsed Time: 0s")
+        self.layout.addWidget(self.timer_label)
+        # Per-sensor rates and errors, one line per sensor, refreshed with the timer
+        self.telemetry_label = QLabel("")
+        self.telemetry_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        metrics = self.telemetry_label.fontMetrics()
+        self.telemetry_label.setMinimumSize(metrics.horizontalAdvance("0" * TELEMETRY_COLUMNS),
+                                            metrics.lineSpacing() * MAX_SENSORS)
+        policy = self.telemetry_label.sizePolicy()
+        policy.setRetainSizeWhenHidden(True)
+        self.telemetry_label.setSizePolicy(policy)
+        self.layout.addWidget(self.telemetry_label)
+        self.preview = SignalPreview(window=PREVIEW_SECONDS * FREQUENCY_HZ, fps=PREVIEW_FPS, strips=MAX_SENSORS)
+        self.layout.addWidget(self.preview, 1)
         self.setLayout(self.layout)
         self.timer = QTimer(self)
         self.elapsed_time = 0
         self.timer.timeout.connect(self.update_timer)
-        self.async_runner = AsyncRunner()
-        self.async_runner.updateStatus.connect(self.setStatus)
-        self.async_runner.sensorsConnected.connect(self.start_timer)
+        self.capture = None
+        self.exercise_record = None
+        self.stopping = False
+        self.abort_message = None
+        gui_bridge.subscribe("session_stopped", self.onSessionStopped)
+        gui_bridge.subscribe("abort", self.onAbort)
+        gui_bridge.subscribe("status", self.setStatus)
+        gui_bridge.subscribe("error", self.setStatus)
+        gui_bridge.subscribe("metrics", self.updateTelemetry)
 
     def toggle_timer_label(self, show):
         self.timer_label.setVisible(show)
+        self.telemetry_label.setVisible(show)
 
     def setStatus(self, status):
         self.status_label.setText(status)
 
     def startExercise(self):
-        global csv_filename, start_times, selected_exercise_config
-
         exercise_name = self.exercise_name_dropdown.currentText()
-        selected_exercise_config = EXERCISE_CONFIG[exercise_name]
-        start_times = {i: None for i in selected_exercise_config["sensors"]}
+        config = EXERCISE_CONFIG[exercise_name]
 
         self.start_timer()
         self.toggle_timer_label(True)
 
         school_name = get_saved_school_name()
         date_selected = get_saved_date().toString("ddMMyyyy")
-        grade = self.grade_input.text()
-
-        # Generate a unique hashed ID for the CSV file
-        hash_info = f"{school_name}_{date_selected}_{grade}_{exercise_name}"
-        hashed_id = generate_hashed_id(hash_info)
-
-        os.makedirs("./data", exist_ok=True)
-        csv_filename = f"./data/{hashed_id}.csv"
-        with open(csv_filename, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(selected_exercise_config["columns"])
-
-        # Prepare record to later append to the exercise log
-        global exercise_record
-        exercise_record = {
-            "school_name": school_name,
-            "date": date_selected,
-            "name": self.name_input.text(),
-            "grade": grade,
-            "height": self.height_input.text(),
-            "gender": self.gender_dropdown.currentText(),
-            "exercise_name": exercise_name,
-            "file_id": hashed_id,
-            "label": None  # Initially, label is None
-        }
+
+        # Prepare record to later append to the exercise log; its file_id
+        # names the data file
+        self.exercise_record = new_record(exercise_name, school_name, date_selected, self.name_input.text(),
+                                          self.grade_input.text(), self.height_input.text(),
+                                          self.gender_dropdown.currentText())
+        writer = create_writer("./data", self.exercise_record, config["columns"], RECORDING_FORMAT)
+
+        self.capture = Capture(ble_manager, config, writer, gui_bridge)
+        self.capture.rings = {i: SignalRing() for i in config["sensors"]}
+        names = {self.capture.telemetry.names[i]: i for i in config["sensors"]}
+        self.preview.set_sources([(name, self.capture.rings[i]) for name, i in names.items()],
+                                 caption=lambda name, capture=self.capture: capture.feature_summary(names[name]))
+        self.telemetry_label.setText("")
 
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
-        self.async_runner.start()
+        self.setStatus("Connecting to sensors...")
+        self.capture.start()
 
     def stopExercise(self):
-        self.async_runner.stop()
-        self.async_runner.wait()
+        # Only asks the capture loop to stop; the rest happens in
+        # onSessionStopped once the recording has been written out
+        if self.stopping or self.capture is None or not self.capture.is_running():
+            return
+        self.stopping = True
+        self.stop_button.setEnabled(False)
+        self.setStatus("Stopping...")
+        self.capture.stop()
+
+    def onAbort(self, message):
+        # Posted once per session when the quality monitor gives up on a
+        # sensor; the reason is shown in the keep-data dialog rather than a
+        # dialog of its own
+        if self.stopping or self.capture is None or not self.capture.is_running():
+            return
+        self.abort_message = message
+        self.stopExercise()
+        self.setStatus(message)
+
+    def updateTelemetry(self, _):
+        if self.capture is not None:
+            self.telemetry_label.setText(self.capture.telemetry.panel_text(self.capture.aligner))
+
+    def onSessionStopped(self, latency):
+        self.stopping = False
         self.timer.stop()  # Ensure the timer stops here
-        exercise_name = self.exercise_name_dropdown.currentText()
+        capture = self.capture
+        self.updateTelemetry(None)
 
         msgBox = QMessageBox(self)
         msgBox.setIcon(QMessageBox.Question)
-        msgBox.setText("Do you want to keep the data?")
+        question = "Do you want to keep the data?"
+        if self.abort_message:
+            question = f"{self.abort_message}\n\n{question}"
+            self.abort_message = None
+        msgBox.setText(question)
         msgBox.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
         yesButton = msgBox.button(QMessageBox.Yes)
         msgBox.setDefaultButton(yesButton)
@@ -766,20 +252,12 @@ class MainPage(QWizardPage):
                 self, 'Input Dialog', 'Enter a label for the data:', ["Good", "Idle", "Anomaly"], 0, False
             )
             if ok:
-                global csv_filename, exercise_record
-                exercise_record["label"] = label  # Update the label in the record
-                base, ext = os.path.splitext(csv_filename)
-                new_filename = f"{base}_{exercise_name}{ext}"
-                os.rename(csv_filename, new_filename)
-
-                # Append the record with the label to the exercise log
-                append_to_exercise_record(exercise_record["date"], exercise_record)
-
+                new_filename = capture.save(self.exercise_record, label)
                 self.setStatus(f"Data labeled as {label} and saved to {new_filename}")
             else:
                 self.setStatus("Label input canceled")
         else:
-            os.remove(csv_filename)
+            capture.discard()
             self.setStatus("Data discarded")
 
         self.elapsed_time = 0
@@ -822,8 +300,14 @@ class FinishPage(QWizardPage):
         layout.addWidget(self.finish_label)
         self.setLayout(layout)
 
-if __name__ == "__main__":
+def main():
     app = QApplication(sys.argv)
     ex = ExerciseApp()
     ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    gui_bridge.start()
+    exit_code = app.exec_()
+    ble_manager.shutdown()
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+from PyQt5.QtCore import QPointF, QRectF, Qt, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+# Live preview of the incoming signals. The BLE loop thread only copies each
+# parsed block into a fixed-size ring per sensor; the GUI thread repaints at
+# most `fps` times a second, reducing the visible window to a min/max pair
+# per pixel column, so drawing costs the same at any session length or rate.
+RING_CAPACITY = 4096  # samples kept per sensor
+MAX_COLUMNS = 300  # decimated points per trace
+STRIP_HEIGHT = 60  # least height per sensor strip
+AXIS_COLORS = [QColor(220, 50, 47), QColor(38, 139, 210), QColor(133, 153, 0)]
+
+
+class SignalRing:
+    # Last `capacity` samples (six IMU values each) of one sensor
+    def __init__(self, capacity=RING_CAPACITY):
+        self.data = np.zeros((capacity, 6))
+        self.capacity = capacity
+        self.count = 0  # samples written so far
+        self._lock = threading.Lock()
+
+    def extend(self, values):
+        values = values[-self.capacity:]
+        n = len(values)
+        with self._lock:
+            start = self.count % self.capacity
+            first = min(n, self.capacity - start)
+            self.data[start:start + first] = values[:first]
+            self.data[:n - first] = values[first:]
+            self.count += n
+
+    def latest(self, n):
+        # The last n samples (fewer if not written yet), oldest first
+        with self._lock:
+            n = min(n, self.count, self.capacity)
+            end = self.count % self.capacity
+            if n <= end:
+                return self.data[end - n:end].copy()
+            return np.concatenate((self.data[self.capacity - (n - end):], self.data[:end]))
+
+
+def minmax_decimate(values, columns):
+    # Reduce (n, channels) to at most `columns` (low, high) pairs, so spikes
+    # survive the reduction; the oldest n % columns samples are left out
+    n = len(values)
+    if n <= columns:
+        return values, values
+    per_column = n // columns
+    blocks = values[n - per_column * columns:].reshape(columns, per_column, -1)
+    return blocks.min(axis=1), blocks.max(axis=1)
+
+
+class SignalPreview(QWidget):
+    # One strip per sensor, accelerometer axes on the left half and
+    # gyroscope axes on the right, each autoscaled. `strips` is the most
+    # sensors it will show; their room is reserved up front, so a window
+    # laid out around the preview never has to grow.
+    def __init__(self, window=250, fps=10, strips=2, parent=None):
+        super().__init__(parent)
+        self.window = window  # samples shown per trace
+        self.strips = strips
+        self.sources = []  # [(name, SignalRing)]
+        self.caption = None  # caption(name) -> text shown next to a sensor's name
+        self._drawn = None
+        self.setMinimumHeight(STRIP_HEIGHT * strips)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start(int(1000 / fps))
+
+    def set_sources(self, sources, caption=None):
+        self.sources = list(sources)
+        self.caption = caption
+        self._drawn = None
+        self.setMinimumHeight(STRIP_HEIGHT * max(self.strips, len(self.sources)))
+        self.update()
+
+    def _refresh(self):
+        # Only repaint when something new arrived since the last frame
+        counts = [ring.count for _, ring in self.sources]
+        if counts != self._drawn and self.isVisible():
+            self._drawn = counts
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        if not self.sources:
+            return
+        strip_height = self.height() / len(self.sources)
+        half_width = self.width() / 2
+        for row, (name, ring) in enumerate(self.sources):
+            values = ring.latest(self.window)
+            top = row * strip_height
+            for part, columns in enumerate((slice(0, 3), slice(3, 6))):
+                area = QRectF(part * half_width + 2, top + 14, half_width - 4, strip_height - 16)
+                painter.setPen(QColor(200, 200, 200))
+                painter.drawRect(area)
+                if len(values):
+                    self._draw_traces(painter, area, values[:, columns])
+            painter.setPen(Qt.black)
+            painter.drawText(QPointF(4, top + 12), f"{name}  accel")
+            caption = self.caption(name) if self.caption is not None else ""
+            painter.drawText(QPointF(half_width + 4, top + 12), f"gyro  {caption}" if caption else "gyro")
+        painter.end()
+
+    def _draw_traces(self, painter, area, values):
+        low, high = minmax_decimate(values, min(MAX_COLUMNS, max(1, int(area.width()))))
+        bottom, top = float(low.min()), float(high.max())
+        if top - bottom < 1.0:
+            middle = (top + bottom) / 2
+            bottom, top = middle - 0.5, middle + 0.5
+        # A full window spans the width, so a filling buffer grows from the right
+        per_column = len(values) // len(low)
+        x_scale = area.width() / max(1.0, self.window / per_column - 1)
+        y_scale = area.height() / (top - bottom)
+        # Right-align so the newest sample is always at the right edge
+        x_offset = area.right() - (len(low) - 1) * x_scale
+        for axis in range(values.shape[1]):
+            painter.setPen(QPen(AXIS_COLORS[axis], 1))
+            points = []
+            for i, (lo, hi) in enumerate(zip(low[:, axis].tolist(), high[:, axis].tolist())):
+                x = x_offset + i * x_scale
+                points.append(QPointF(x, area.bottom() - (lo - bottom) * y_scale))
+                if hi != lo:
+                    points.append(QPointF(x, area.bottom() - (hi - bottom) * y_scale))
+            painter.drawPolyline(QPolygonF(points))
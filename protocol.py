@@ -0,0 +1,89 @@
+import numpy as np
+
+# Binary notifications start with a version byte followed by fixed-size
+# little-endian records. Version bytes are >= 0x80 so they can never be the
+# first byte of a text notification, which is always printable ASCII.
+VERSION_FLOAT32 = 0x81
+VERSION_INT16 = 0x82
+
+# uint32 index + six float32 values (accel X/Y/Z in m/s^2, gyro X/Y/Z in dps)
+RECORD_FLOAT32 = np.dtype([("index", "<u4"), ("values", "<f4", (6,))])
+# uint32 index + six int16 values scaled by INT16_SCALE
+RECORD_INT16 = np.dtype([("index", "<u4"), ("values", "<i2", (6,))])
+# Accel in 0.01 m/s^2 steps, gyro in 0.1 dps steps
+INT16_SCALE = np.array([100.0, 100.0, 100.0, 10.0, 10.0, 10.0])
+
+_COMMA = (b',',)
+
+RECORD_TYPES = {
+    VERSION_FLOAT32: RECORD_FLOAT32,
+    VERSION_INT16: RECORD_INT16,
+}
+
+
+def is_binary(data):
+    return len(data) > 0 and data[0] >= 0x80
+
+
+def decode_notification(data):
+    # Decode one binary notification into an (n, 7) float64 array of samples,
+    # laid out like the text protocol: index followed by the six IMU values
+    version = data[0]
+    record = RECORD_TYPES.get(version)
+    if record is None:
+        raise ValueError(f"Unknown protocol version: 0x{version:02x}")
+    payload_size = len(data) - 1
+    if payload_size % record.itemsize:
+        raise ValueError(f"Truncated notification: {payload_size} bytes is not a multiple of {record.itemsize}")
+    records = np.frombuffer(data, dtype=record, offset=1)
+    samples = np.empty((len(records), 7), dtype=np.float64)
+    samples[:, 0] = records["index"]
+    samples[:, 1:] = records["values"]
+    if version == VERSION_INT16:
+        samples[:, 1:] /= INT16_SCALE
+    return samples
+
+
+def encode_notification(indices, values, version=VERSION_FLOAT32):
+    # Build a binary notification the way the firmware does, for simulators
+    # and tests that run without hardware
+    record = RECORD_TYPES[version]
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 6)
+    records = np.empty(len(values), dtype=record)
+    records["index"] = indices
+    if version == VERSION_INT16:
+        records["values"] = np.clip(np.round(values * INT16_SCALE), -32768, 32767)
+    else:
+        records["values"] = values
+    return bytes([version]) + records.tobytes()
+
+
+def parse_text_block(block):
+    # Parse a block of complete "index,ax,ay,az,gx,gy,gz" lines (as returned
+    # by LineFramer.feed_block) into (samples, errors), where samples is an
+    # (n, 7) float64 array. Well-formed blocks are converted with a single
+    # NumPy call; if any line is malformed the block is parsed line by line
+    # so only the bad lines are dropped. errors is a list of (line, message).
+    lines = block.split(b'\n')
+    if list(map(bytes.count, lines, _COMMA * len(lines))).count(6) == len(lines):
+        try:
+            samples = np.array(block.replace(b'\n', b',').split(b','), dtype=np.float64)
+        except ValueError:
+            pass
+        else:
+            return samples.reshape(-1, 7), []
+
+    rows = []
+    errors = []
+    for line in lines:
+        if not line.strip():
+            continue
+        parts = line.split(b',')
+        if len(parts) != 7:
+            errors.append((line, f"Incorrect number of values: {len(parts)}"))
+            continue
+        try:
+            rows.append([float(part) for part in parts])
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return np.array(rows, dtype=np.float64).reshape(-1, 7), errors
@@ -0,0 +1,189 @@
+from collections import deque
+
+import numpy as np
+
+# Streaming data-quality checks per sensor, judged over a sliding window
+# rather than per session, so a long recording survives a few stray
+# glitches while a sensor that is really broken is caught within seconds.
+# Counts live in one-second buckets (a fixed number per sensor) and each
+# block of samples costs a handful of vectorised operations. Checks run on
+# a timer rather than when data arrives, so a sensor that goes quiet is
+# caught too.
+QUALITY_WINDOW = 10  # seconds the rates are measured over
+MIN_SAMPLES = 50  # lines in the window before error and gap rates are judged, 2 s at 25 Hz
+MAX_RECONNECTS = 3  # forced reconnects per sensor before bad data aborts instead
+ACCEL_FULL_SCALE = 16 * 9.80665  # m/s^2, the LSM6DS3 library default of +-16 g
+GYRO_FULL_SCALE = 2000.0  # dps, the LSM6DS3 library default
+SATURATION = 0.98  # fraction of full scale counted as saturated
+
+# (warn, reconnect, abort) per metric, None never takes that step. A metric
+# that still reaches its reconnect threshold after MAX_RECONNECTS aborts if
+# it has an abort threshold and only warns if it has none.
+THRESHOLDS = {
+    "error_rate": (0.02, 0.10, 0.30),  # parse errors per received line
+    "gap_rate": (0.05, 0.20, 0.50),  # missing indices per expected sample
+    "stuck_seconds": (2.0, 5.0, 15.0),  # all six values unchanged for this long
+    "silent_seconds": (1.0, 3.0, 15.0),  # no samples for this long, or never connected
+    "saturated_fraction": (0.05, None, None),  # samples with an axis at full scale; a reconnect cannot unclip
+    "rate_deviation": (0.05, 0.20, None),  # |index rate / FREQUENCY_HZ - 1|
+}
+
+
+def describe(metric, value, frequency_hz):
+    if metric == "error_rate":
+        return f"{value:.0%} of lines unreadable"
+    if metric == "gap_rate":
+        return f"{value:.0%} of samples missing"
+    if metric == "stuck_seconds":
+        return f"values stuck for {value:.1f}s"
+    if metric == "silent_seconds":
+        return f"no data for {value:.1f}s"
+    if metric == "saturated_fraction":
+        return f"{value:.0%} of samples at full scale"
+    return f"sending at {value * 100:.0f}% off {frequency_hz} Hz"
+
+
+class SensorQuality:
+    def __init__(self, frequency_hz):
+        self.frequency_hz = frequency_hz
+        self.level = 0
+        self.warnings = 0
+        self.forced_reconnects = 0
+        self.worst = {}  # highest value seen per metric
+        self.limits = np.array([ACCEL_FULL_SCALE] * 3 + [GYRO_FULL_SCALE] * 3) * SATURATION
+        self._reset()
+
+    def _reset(self):
+        # [second, lines, errors, samples, gaps, saturated, last index]
+        self._seconds = deque(maxlen=QUALITY_WINDOW + 1)
+        self._started = None  # second of the first sample on this connection
+        self._last_index = None
+        self._last_values = None
+        self.stuck_run = 0  # samples in a row without any change
+        self._heard_at = None  # last sample, or the first check on this connection before any
+
+    def _bucket(self, now):
+        second = int(now)
+        if not self._seconds or self._seconds[-1][0] != second:
+            self._seconds.append([second, 0, 0, 0, 0, 0, None])
+        return self._seconds[-1]
+
+    def on_samples(self, indices, values, now):
+        # indices and values (n x 6) of one parsed block, in order
+        n = len(indices)
+        if n == 0:
+            return
+        self._heard_at = now
+        bucket = self._bucket(now)
+        if self._started is None:
+            self._started = bucket[0]
+        bucket[1] += n
+        bucket[3] += n
+        if self._last_index is not None:
+            indices = np.concatenate(([self._last_index], indices))
+        steps = np.diff(indices)
+        bucket[4] += int(np.sum(steps[steps > 1] - 1))
+        self._last_index = float(indices[-1])
+        bucket[6] = self._last_index
+        bucket[5] += int(np.any(np.abs(values) >= self.limits, axis=1).sum())
+        rows = values if self._last_values is None else np.vstack((self._last_values, values))
+        changed = np.flatnonzero(np.any(rows[1:] != rows[:-1], axis=1))
+        if len(changed):
+            self.stuck_run = len(rows) - 2 - int(changed[-1])
+        else:
+            self.stuck_run += len(rows) - 1
+        self._last_values = values[-1].copy()
+
+    def on_error(self, now):
+        bucket = self._bucket(now)
+        bucket[1] += 1
+        bucket[2] += 1
+
+    def on_reconnect(self):
+        # Judge the new connection on its own data
+        self._reset()
+
+    def metrics(self, now):
+        current = int(now)
+        buckets = [b for b in self._seconds if b[0] > current - QUALITY_WINDOW]
+        lines, errors, samples, gaps, saturated = (sum(b[i] for b in buckets) for i in range(1, 6))
+        if self._heard_at is None:
+            self._heard_at = now
+        metrics = {"stuck_seconds": self.stuck_run / self.frequency_hz, "silent_seconds": now - self._heard_at}
+        if lines >= MIN_SAMPLES:
+            metrics["error_rate"] = errors / lines
+        if samples + gaps >= MIN_SAMPLES:
+            metrics["gap_rate"] = gaps / (samples + gaps)
+            metrics["saturated_fraction"] = saturated / samples if samples else 0.0
+        # Index rate over whole seconds up to the current one, leaving out the
+        # first one on a connection, which carries the backlog the firmware
+        # buffered. Seconds without samples count, so a stalled stream
+        # heads for 0 Hz.
+        complete = [b for b in buckets if self._started < b[0] < current and b[6] is not None] \
+            if self._started is not None else []
+        if len(complete) >= 3:
+            rate = (complete[-1][6] - complete[0][6]) / (current - 1 - complete[0][0])
+            metrics["rate_deviation"] = abs(rate / self.frequency_hz - 1)
+        return metrics
+
+    def evaluate(self, now, thresholds):
+        # Returns (level, metric, reason) for the worst metric
+        level, worst, reason = 0, None, None
+        for metric, value in self.metrics(now).items():
+            if value > self.worst.get(metric, 0.0):
+                self.worst[metric] = value
+            limits = thresholds[metric]
+            for step in (3, 2, 1):
+                if limits[step - 1] is not None and value >= limits[step - 1]:
+                    if step > level:
+                        level, worst, reason = step, metric, describe(metric, value, self.frequency_hz)
+                    break
+        return level, worst, reason
+
+    def summary(self):
+        return {
+            "warnings": self.warnings,
+            "forced_reconnects": self.forced_reconnects,
+            "worst": {metric: round(value, 4) for metric, value in self.worst.items()},
+        }
+
+
+class QualityMonitor:
+    # Turns the per-sensor levels into actions; check() is meant to be called
+    # for every sensor about once a second and returns None or
+    # (action, reason), where action is
+    #   warn       data got worse than the warn thresholds
+    #   ok         back within them
+    #   reconnect  drop the connection and let the capture reconnect
+    #   abort      stop the exercise
+    # Each action is returned once when the level changes, not on every
+    # check while it lasts.
+    def __init__(self, sensor_ids, frequency_hz, thresholds=THRESHOLDS):
+        self.thresholds = thresholds
+        self.sensors = {i: SensorQuality(frequency_hz) for i in sensor_ids}
+
+    def check(self, sensor_id, now):
+        sensor = self.sensors[sensor_id]
+        level, metric, reason = sensor.evaluate(now, self.thresholds)
+        previous = sensor.level
+        if level == 2:
+            if sensor.forced_reconnects < MAX_RECONNECTS:
+                sensor.forced_reconnects += 1
+                sensor.on_reconnect()
+                sensor.level = 0
+                return "reconnect", reason
+            # Reconnecting did not help
+            level = 3 if self.thresholds[metric][2] is not None else 1
+            reason = f"{reason} after {sensor.forced_reconnects} reconnects"
+        sensor.level = level
+        if level == previous:
+            return None
+        if level == 3:
+            return "abort", reason
+        if level == 1:
+            sensor.warnings += 1
+            return "warn", reason
+        return "ok", None
+
+    def report(self):
+        return {i: sensor.summary() for i, sensor in self.sensors.items()}
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import os
+import struct
+
+import numpy as np
+
+from session_writer import SessionWriter
+
+# Binary recording layout: MAGIC followed by tagged blocks
+#   b"H" uint32 length + JSON {"columns": [...], "dtypes": [...], "metadata": {...}},
+#        always first
+#   b"C" one chunk of frames: for each distinct dtype in "dtypes", in order of
+#        first appearance, an np.save'd column-major array holding those
+#        columns for the rows of the chunk
+#   b"M" uint32 length + JSON metadata update, merged over the header metadata
+# Chunks are self-describing .npy blocks, so a file cut short by a crash
+# still loads up to its last complete chunk.
+MAGIC = b"ZREC\x01"
+EXTENSION = ".zrec"
+
+
+def column_dtypes(columns):
+    # Host timestamps keep float64, firmware indices are uint32 and the IMU
+    # values (sent with two decimals) fit float32
+    dtypes = []
+    for name in columns:
+        if name == "timestamp":
+            dtypes.append("<f8")
+        elif name.endswith("_index"):
+            dtypes.append("<u4")
+        else:
+            dtypes.append("<f4")
+    return dtypes
+
+
+def _dtype_groups(dtypes):
+    groups = {}
+    for i, dtype in enumerate(dtypes):
+        groups.setdefault(dtype, []).append(i)
+    return list(groups.items())
+
+
+def _write_json_block(f, tag, payload):
+    data = json.dumps(payload).encode('utf-8')
+    f.write(tag + struct.pack('<I', len(data)) + data)
+
+
+class BinarySessionWriter(SessionWriter):
+    # SessionWriter that stores frames as chunks of typed columns instead of
+    # CSV text; `metadata` (the exercise record) goes into the file header
+    def __init__(self, filename, columns, metadata=None, batch_size=500, flush_interval=1.0):
+        self.metadata = dict(metadata or {})
+        self.dtypes = column_dtypes(columns)
+        self._groups = _dtype_groups(self.dtypes)
+        super().__init__(filename, columns, batch_size=batch_size, flush_interval=flush_interval)
+
+    def _open(self):
+        self._file = open(self.filename, 'wb')
+        self._file.write(MAGIC)
+        _write_json_block(self._file, b"H", {"columns": self.columns, "dtypes": self.dtypes,
+                                             "metadata": self.metadata})
+
+    def _write_rows(self, rows):
+        frames = np.array(rows, dtype=np.float64)
+        self._file.write(b"C")
+        for dtype, columns in self._groups:
+            np.save(self._file, np.asfortranarray(frames[:, columns].astype(dtype)), allow_pickle=False)
+
+
+def append_metadata(filename, metadata):
+    # Add a metadata update (e.g. the label chosen after recording) to a
+    # closed recording without rewriting it
+    with open(filename, 'ab') as f:
+        _write_json_block(f, b"M", metadata)
+
+
+class Recording:
+    # Frames are returned as one float64 (rows, columns) array whatever the
+    # stored column dtypes were
+    def __init__(self, columns, dtypes, data, metadata):
+        self.columns = columns
+        self.dtypes = dtypes
+        self.data = data
+        self.metadata = metadata
+
+    def __len__(self):
+        return len(self.data)
+
+    def column(self, name):
+        return self.data[:, self.columns.index(name)]
+
+
+def read_recording(filename):
+    columns = None
+    dtypes = None
+    groups = None
+    metadata = {}
+    chunks = []
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filename} is not a recording file")
+        while True:
+            tag = f.read(1)
+            if not tag:
+                break
+            if tag in (b"H", b"M"):
+                header = f.read(4)
+                if len(header) < 4:
+                    break
+                (size,) = struct.unpack('<I', header)
+                payload = f.read(size)
+                if len(payload) < size:
+                    break
+                payload = json.loads(payload)
+                if tag == b"H":
+                    columns = payload["columns"]
+                    dtypes = payload["dtypes"]
+                    groups = _dtype_groups(dtypes)
+                    metadata.update(payload.get("metadata", {}))
+                else:
+                    metadata.update(payload)
+            elif tag == b"C":
+                if groups is None:
+                    raise ValueError(f"{filename} has no header")
+                try:
+                    parts = [(group, np.load(f, allow_pickle=False)) for _, group in groups]
+                except (ValueError, EOFError, OSError):
+                    # Truncated last chunk, keep what was complete
+                    break
+                chunk = np.empty((len(parts[0][1]), len(columns)), dtype=np.float64)
+                for group, part in parts:
+                    chunk[:, group] = part
+                chunks.append(chunk)
+            else:
+                raise ValueError(f"Unknown block {tag!r} in {filename}")
+    if columns is None:
+        raise ValueError(f"{filename} has no header")
+    data = np.concatenate(chunks) if chunks else np.empty((0, len(columns)))
+    return Recording(columns, dtypes, data, metadata)
+
+
+def to_csv(filename, csv_filename=None):
+    # Write a recording in the same CSV layout the capture app writes
+    recording = read_recording(filename)
+    if csv_filename is None:
+        csv_filename = os.path.splitext(filename)[0] + ".csv"
+    # Format each column in its stored dtype so values print as they were
+    # recorded (e.g. -6.29 rather than the float64 widening of the float32)
+    text = np.empty(recording.data.shape, dtype=object)
+    for dtype, columns in _dtype_groups(recording.dtypes):
+        text[:, columns] = recording.data[:, columns].astype(dtype).astype(str)
+    with open(csv_filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(recording.columns)
+        writer.writerows(text.tolist())
+    return csv_filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and convert binary session recordings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("to-csv", help="convert recordings to the capture CSV layout")
+    convert.add_argument("files", nargs="+")
+    info = commands.add_parser("info", help="print columns, row count and metadata")
+    info.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    for filename in args.files:
+        if args.command == "to-csv":
+            print(f"{filename} -> {to_csv(filename)}")
+        else:
+            recording = read_recording(filename)
+            print(f"{filename}: {len(recording)} rows, {len(recording.columns)} columns")
+            print(json.dumps(recording.metadata, indent=4))
+
+
+if __name__ == "__main__":
+    main()
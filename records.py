@@ -0,0 +1,165 @@
+import argparse
+import glob
+import json
+import os
+import sys
+
+# Exercise records are kept one JSON object per line, one file per day, so
+# saving a record is a single append no matter how many the day already has.
+# A crash can at worst leave a partial last line, which readers skip.
+RECORDS_DIR = '.'
+
+
+def records_filename(date, directory=RECORDS_DIR):
+    return os.path.join(directory, f'exercise_records_{date}.jsonl')
+
+
+def append_record(date, record, directory=RECORDS_DIR, fsync=True):
+    line = (json.dumps(record) + "\n").encode('utf-8')
+    with open(records_filename(date, directory), 'a+b') as f:
+        # Start on a fresh line if a crash left the last one unfinished
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        f.write(line)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+
+
+def _recover_array(text):
+    # The complete objects at the start of a JSON array that was cut short
+    decoder = json.JSONDecoder()
+    records = []
+    position = text.find('[') + 1
+    if position == 0:
+        return records
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        try:
+            record, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            return records
+        records.append(record)
+
+
+def read_legacy_file(filename):
+    # (records, error) for a legacy exercise_records_*.json array. The old
+    # app rewrote the whole array on every save, so a crash could leave it
+    # cut short; then the records before the cut come back with the error.
+    with open(filename, 'r') as f:
+        text = f.read()
+    try:
+        records = json.loads(text)
+    except json.JSONDecodeError as e:
+        return _recover_array(text), e
+    if not isinstance(records, list):
+        return [], ValueError("not a JSON array")
+    return records, None
+
+
+def read_records_file(filename):
+    # Read a .jsonl record log, or a legacy exercise_records_*.json array
+    if filename.endswith('.json'):
+        try:
+            records, error = read_legacy_file(filename)
+        except FileNotFoundError:
+            return []
+        if error is not None:
+            print(f"{filename} is damaged ({error}), reading the {len(records)} complete records before it")
+        return records
+
+    records = []
+    try:
+        with open(filename, 'r') as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable record {filename}:{number}")
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def read_records(date, directory=RECORDS_DIR):
+    return read_records_file(records_filename(date, directory))
+
+
+def record_files(directory=RECORDS_DIR):
+    # Every record file in directory, legacy .json and .jsonl
+    return sorted(glob.glob(os.path.join(directory, 'exercise_records_*.json')) +
+                  glob.glob(os.path.join(directory, 'exercise_records_*.jsonl')))
+
+
+def _write_records(filename, records):
+    # Replace filename atomically so an interrupted rewrite loses nothing
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
+
+def compact(filename):
+    # Rewrite a .jsonl log without blank or partial lines
+    records = read_records_file(filename)
+    _write_records(filename, records)
+    return len(records)
+
+
+def migrate(directory=RECORDS_DIR, recover=False):
+    # Convert legacy exercise_records_*.json arrays to .jsonl logs. Records
+    # already appended to a .jsonl for the same day are kept after the legacy
+    # ones; the legacy file is renamed to *.json.migrated. A legacy file that
+    # does not decode is left alone and returned in `damaged`, unless
+    # recover is set: then the complete records before the damage are
+    # migrated. Returns (migrated, damaged).
+    migrated = []
+    damaged = []
+    for legacy in sorted(glob.glob(os.path.join(directory, 'exercise_records_*.json'))):
+        legacy_records, error = read_legacy_file(legacy)
+        if error is not None and not recover:
+            damaged.append((legacy, len(legacy_records), error))
+            continue
+        target = legacy + 'l'
+        records = legacy_records + read_records_file(target)
+        _write_records(target, records)
+        os.replace(legacy, legacy + '.migrated')
+        migrated.append((legacy, target, len(records)))
+    return migrated, damaged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the exercise record logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="convert exercise_records_*.json to .jsonl")
+    migrate_parser.add_argument("directory", nargs="?", default=RECORDS_DIR)
+    migrate_parser.add_argument("--recover", action="store_true",
+                                help="migrate the complete records of damaged files too")
+    compact_parser = commands.add_parser("compact", help="drop blank or partial lines from .jsonl logs")
+    compact_parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrated, damaged = migrate(args.directory, args.recover)
+        for legacy, target, count in migrated:
+            print(f"{legacy} -> {target} ({count} records)")
+        for legacy, count, error in damaged:
+            print(f"{legacy} is damaged ({error}), left in place; "
+                  f"--recover migrates the {count} complete records before the damage")
+        return 1 if damaged else 0
+    for filename in args.files:
+        print(f"{filename}: {compact(filename)} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections import defaultdict
+
+
+class CaptureSession:
+    # Lifecycle of one recording session on the capture event loop. Stopping
+    # is signalled through an asyncio.Event instead of a polled flag, so every
+    # sensor coroutine wakes up the moment stop is requested and tears down
+    # concurrently; anything still running after `grace` seconds is cancelled.
+    def __init__(self, grace=0.5):
+        self.grace = grace
+        self.loop = None
+        self.stop_requested_at = None
+        self.stopped_at = None
+        self.reconnects = defaultdict(int)
+        self._stop = None
+
+    def bind(self, loop=None):
+        # Must be called on the loop that runs the session
+        self.loop = loop or asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self.stop_requested_at is not None:
+            # Stop was requested before the loop got going
+            self._stop.set()
+
+    @property
+    def stopping(self):
+        return self._stop is not None and self._stop.is_set()
+
+    def request_stop(self):
+        # Safe to call from any thread, e.g. the Qt GUI thread
+        if self.stop_requested_at is None:
+            self.stop_requested_at = time.perf_counter()
+        if self.loop is None or self._stop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        except RuntimeError:
+            # The loop has already shut down, nothing left to stop
+            pass
+
+    async def wait_stopped(self):
+        await self._stop.wait()
+
+    async def until_stopped(self, coro):
+        # Run coro unless stop is requested first; returns None if cancelled
+        task = asyncio.ensure_future(coro)
+        stop = asyncio.ensure_future(self._stop.wait())
+        await asyncio.wait([task, stop], return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+        if task.done():
+            return task.result()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return None
+
+    async def supervise(self, coros):
+        # Run the per-sensor coroutines until they all finish or stop is
+        # requested, then give them `grace` seconds to clean up before
+        # cancelling the rest
+        tasks = [asyncio.ensure_future(c) for c in coros]
+        if not tasks:
+            return []
+        stop = asyncio.ensure_future(self._stop.wait())
+        pending = set(tasks)
+        while pending and not stop.done():
+            done, pending = await asyncio.wait(pending | {stop}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(stop)
+        stop.cancel()
+        if pending:
+            done, pending = await asyncio.wait(pending, timeout=self.grace)
+            for task in pending:
+                task.cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def mark_stopped(self):
+        self.stopped_at = time.perf_counter()
+
+    def stop_latency(self):
+        # Seconds from request_stop() to mark_stopped(), or None
+        if self.stop_requested_at is None or self.stopped_at is None:
+            return None
+        return self.stopped_at - self.stop_requested_at
@@ -0,0 +1,104 @@
+import csv
+import queue
+import threading
+import time
+
+# Marker put on the queue to tell the writer thread to finish up
+_CLOSE = object()
+
+
+class SessionWriter:
+    # Writes the rows of one recording session to a single long-lived file.
+    # Rows are handed over through a queue so the asyncio loop that services
+    # the BLE callbacks never blocks on disk; a background thread writes them
+    # out in batches, flushing every `batch_size` rows or every
+    # `flush_interval` seconds, whichever comes first. Subclasses change the
+    # file format by overriding _open(), _write_rows() and _finish().
+    def __init__(self, filename, columns, batch_size=50, flush_interval=0.5):
+        self.filename = filename
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.rows_lost = 0  # rows that could not be written
+        self.error = None  # the first OSError, if any; the file is then incomplete
+
+        self._queue = queue.Queue()
+        self._open()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="SessionWriter", daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        self._file = open(self.filename, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def _finish(self):
+        # Called on the writer thread after the last rows, before the file is closed
+        pass
+
+    def write_row(self, row):
+        if self._closed:
+            raise ValueError("Writer is already closed")
+        self._queue.put(row)
+
+    def close(self):
+        # Flush whatever is still queued and release the file handle
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        try:
+            self._file.close()
+        except OSError as e:
+            self._failed(e, [])
+
+    def _flush(self, pending):
+        # Rows only count as written once they are out of the file buffer
+        if pending:
+            self._write_rows(pending)
+        self._file.flush()
+        self.rows_written += len(pending)
+        pending.clear()
+
+    def _run(self):
+        pending = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                row = None
+
+            if row is _CLOSE:
+                try:
+                    self._flush(pending)
+                    self._finish()
+                    self._file.flush()
+                except OSError as e:
+                    self._failed(e, pending)
+                return
+
+            try:
+                if row is not None:
+                    pending.append(row)
+                if len(pending) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush(pending)
+                    last_flush = time.monotonic()
+            except OSError as e:
+                # Keep draining the queue so close() never hangs, but remember
+                # the failure so the caller can report it
+                self._failed(e, pending)
+
+    def _failed(self, error, pending):
+        if self.error is None:
+            self.error = error
+        self.rows_lost += len(pending)
+        pending.clear()
+        print(f"Error writing {self.filename}: {error}")
@@ -0,0 +1,260 @@
+import asyncio
+import csv
+import math
+import random
+from collections import deque
+
+from exercises import column_prefix
+
+# Stand-ins for the XIAO sensors, used through BleManager in place of bleak
+# (see transport.py). Each simulated board behaves like the firmware in
+# arduino_current_best_version.ino: it samples at a fixed rate into a 100
+# sample ring buffer, whether or not a central is connected, and every 30ms
+# sends the buffered samples as "%u,%.2f,..." lines, appending lines until
+# the notification holds 200 bytes (at most 240).
+FIRMWARE_BUFFER_SIZE = 100
+TRANSMIT_INTERVAL = 0.030
+PACKET_FILL = 200
+PACKET_SIZE = 240  # the characteristic size; a line that would not fit waits for the next send
+AXES = ["Accel_X", "Accel_Y", "Accel_Z", "Gyro_X", "Gyro_Y", "Gyro_Z"]
+
+
+def format_line(index, values):
+    return ("%u,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n" % (index, *values)).encode('ascii')
+
+
+def synthetic_samples(sensor_id, rate_hz, rng):
+    # Endless (index, values) stream: a slow swing on top of gravity plus
+    # noise. Boards boot at different times, so indices start anywhere.
+    index = rng.randrange(0, 10000)
+    phase = sensor_id * 0.7
+    while True:
+        t = index / rate_hz
+        swing = math.sin(2 * math.pi * 1.5 * t + phase)
+        turn = math.cos(2 * math.pi * 0.8 * t + phase)
+        yield index, (2.0 * swing + rng.gauss(0, 0.05),
+                      1.0 * turn + rng.gauss(0, 0.05),
+                      9.81 + 0.5 * swing + rng.gauss(0, 0.05),
+                      120.0 * turn + rng.gauss(0, 1.0),
+                      40.0 * swing + rng.gauss(0, 1.0),
+                      15.0 * swing * turn + rng.gauss(0, 1.0))
+        index += 1
+
+
+def _read_columns(filename):
+    if filename.endswith(".zrec"):
+        import recording
+        data = recording.read_recording(filename)
+        return data.columns, data.data.tolist()
+    if filename.endswith((".csv.gz", ".csv.zst")):
+        import compressed
+        columns, blocks = compressed.read_blocks(filename)
+        return columns, [row for block in blocks for row in block.tolist()]
+    with open(filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        rows = [[float(value) for value in row] for row in reader if row]
+    return columns, rows
+
+
+def recorded_samples(filename, sensors):
+    # {sensor_id: [(index, values), ...]} for every sensor that has columns
+    # in a capture CSV (plain or compressed) or .zrec recording. Recordings
+    # without index columns are numbered from 0; frames that repeat an index
+    # were filled by the aligner and are not replayed.
+    columns, rows = _read_columns(filename)
+    samples = {}
+    for sensor_id, (name, _, _) in enumerate(sensors, 1):
+        prefix = column_prefix(name)
+        names = [f"{prefix}_{axis}" for axis in AXES]
+        if not all(column in columns for column in names):
+            continue
+        positions = [columns.index(column) for column in names]
+        index_column = f"{prefix}_index"
+        index_position = columns.index(index_column) if index_column in columns else None
+        sensor_samples = []
+        last_index = None
+        for number, row in enumerate(rows):
+            index = number if index_position is None else int(row[index_position])
+            if index == last_index:
+                continue
+            last_index = index
+            sensor_samples.append((index, tuple(row[p] for p in positions)))
+        samples[sensor_id] = sensor_samples
+    return samples
+
+
+class SimulatedDevice:
+    # One board. Its sample clock and ring buffer outlive connections, so a
+    # reconnect gets the samples buffered while it was away, as on hardware.
+    def __init__(self, sensor_id, name, samples, period):
+        self.sensor_id = sensor_id
+        self.name = name
+        self.address = f"SIM:{sensor_id:02d}"
+        self.samples = samples
+        self.period = period
+        self.buffer = deque(maxlen=FIRMWARE_BUFFER_SIZE)
+        self.next_sample = None
+        self.exhausted = False
+        self.client = None
+        self.down_until = 0.0
+
+    def sample(self, now):
+        # Take every sample that fell due up to now
+        if self.next_sample is None:
+            self.next_sample = now
+        while self.next_sample <= now and not self.exhausted:
+            sample = next(self.samples, None)
+            if sample is None:
+                self.exhausted = True
+                break
+            self.buffer.append(sample)
+            self.next_sample += self.period
+
+
+class SimulatedClient:
+    # Implements the part of BleakClient that BleManager uses
+    def __init__(self, transport, device, disconnected_callback):
+        self.transport = transport
+        self.device = device
+        self.address = device.address
+        self.disconnected_callback = disconnected_callback
+        self._connected = False
+        self._callback = None
+        self._task = None
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self.transport.connect_delay)
+        if loop.time() < self.device.down_until:
+            raise ConnectionError(f"{self.device.name} is not advertising")
+        if self.device.client is not None and self.device.client is not self:
+            raise ConnectionError(f"{self.device.name} is already connected")
+        self.device.client = self
+        self._connected = True
+        self._task = asyncio.create_task(self._transmit())
+        return True
+
+    async def disconnect(self):
+        self._close()
+        return True
+
+    async def start_notify(self, char_uuid, callback):
+        if not self._connected:
+            raise ConnectionError(f"{self.device.name} is not connected")
+        self._callback = callback
+
+    async def stop_notify(self, char_uuid):
+        self._callback = None
+
+    def _close(self):
+        if not self._connected:
+            return
+        self._connected = False
+        self._callback = None
+        if self.device.client is self:
+            self.device.client = None
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if self.disconnected_callback is not None:
+            self.disconnected_callback(self)
+
+    def _line(self, index, values):
+        line = format_line(index, values)
+        rng = self.transport.rng
+        if self.transport.malformed and rng.random() < self.transport.malformed:
+            # Cut the line before its last value so it never parses
+            line = line[:rng.randrange(1, line.rindex(b","))] + b"\n"
+        return line
+
+    async def _transmit(self):
+        transport = self.transport
+        rng = transport.rng
+        loop = asyncio.get_running_loop()
+        drop_at = None
+        if transport.disconnect_every:
+            drop_at = loop.time() + rng.expovariate(1.0 / transport.disconnect_every)
+        while self._connected:
+            await asyncio.sleep(transport.interval + rng.uniform(0, transport.jitter))
+            now = loop.time()
+            if drop_at is not None and now >= drop_at:
+                # Out of range: unreachable for a while, buffer keeps filling
+                self.device.down_until = now + transport.outage
+                self._close()
+                return
+            self.device.sample(now)
+            packet = bytearray()
+            while self.device.buffer and len(packet) < PACKET_FILL:
+                line = self._line(*self.device.buffer[0])
+                if len(packet) + len(line) > PACKET_SIZE:
+                    break
+                self.device.buffer.popleft()
+                packet += line
+            # Without a subscriber the firmware still sends, and the data is gone
+            if packet and self._callback is not None and rng.random() >= transport.loss:
+                self._callback(transport.sensors[self.device.sensor_id - 1][2], packet)
+
+
+class SimulatedTransport:
+    # Transport backed by simulated boards for every sensor in `sensors`
+    # (the UART_SERVICE_UUIDS list).
+    #   rate_hz          samples per second per board
+    #   jitter           extra random delay (s) added to each 30ms send
+    #   loss             probability that a notification is lost
+    #   malformed        probability that a line is corrupted
+    #   disconnect_every mean seconds between connection drops, None for never
+    #   outage           seconds a dropped board stays unreachable
+    #   speed            time scale; 10 runs the boards ten times faster
+    #   sensor_ids       boards that exist, default all of them
+    def __init__(self, sensors, rate_hz=25, jitter=0.005, loss=0.0, malformed=0.0,
+                 disconnect_every=None, outage=1.0, speed=1.0, sensor_ids=None,
+                 connect_delay=0.05, seed=None):
+        self.sensors = sensors
+        self.rate_hz = rate_hz
+        self.jitter = jitter / speed
+        self.loss = loss
+        self.malformed = malformed
+        self.disconnect_every = disconnect_every / speed if disconnect_every else None
+        self.outage = outage / speed
+        self.speed = speed
+        self.interval = TRANSMIT_INTERVAL / speed
+        self.connect_delay = connect_delay
+        self.rng = random.Random(seed)
+        if sensor_ids is None:
+            sensor_ids = range(1, len(sensors) + 1)
+        self.devices = {i: SimulatedDevice(i, sensors[i - 1][0], self._samples(i), 1.0 / (rate_hz * speed))
+                        for i in sensor_ids}
+
+    def _samples(self, sensor_id):
+        return synthetic_samples(sensor_id, self.rate_hz, self.rng)
+
+    async def discover(self, sensors, sensor_ids, timeout):
+        await asyncio.sleep(self.connect_delay)
+        now = asyncio.get_running_loop().time()
+        return {i: self.devices[i] for i in sensor_ids
+                if i in self.devices and now >= self.devices[i].down_until}
+
+    def create_client(self, device, disconnected_callback, timeout):
+        if isinstance(device, str):
+            # Cached address from a previous run
+            device = next((d for d in self.devices.values() if d.address == device), None)
+            if device is None:
+                raise ConnectionError("No simulated sensor at that address")
+        return SimulatedClient(self, device, disconnected_callback)
+
+
+class ReplayTransport(SimulatedTransport):
+    # Plays a recorded session (capture CSV or .zrec) back through simulated
+    # boards at `speed` times real time; each board goes quiet once its
+    # recording runs out. Only sensors with columns in the file exist.
+    def __init__(self, sensors, filename, speed=1.0, rate_hz=25, **options):
+        self.recorded = recorded_samples(filename, sensors)
+        options.setdefault("sensor_ids", sorted(self.recorded))
+        super().__init__(sensors, rate_hz=rate_hz, speed=speed, **options)
+
+    def _samples(self, sensor_id):
+        return iter(self.recorded.get(sensor_id, []))
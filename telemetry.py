@@ -0,0 +1,185 @@
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+
+# Live per-sensor counters for a capture session. The BLE loop thread
+# updates them from the notification callback and handler; the GUI reads
+# them once a second for the telemetry panel, and the totals are saved next
+# to the recording. Everything here is fixed size, however long the session.
+HANDLER_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+ARRIVAL_BUCKETS_MS = (1, 5, 10, 20, 30, 40, 50, 75, 100, 250, 500, 1000, 5000)
+RATE_WINDOW = 5  # seconds the live rates are averaged over
+
+
+class Histogram:
+    # Counts per bucket; bucket i holds values up to edges[i], the last one
+    # everything above. Percentiles are reported as bucket upper edges.
+    def __init__(self, edges):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if self.count == 0:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.edges[i] if i < len(self.edges) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "edges_ms": list(self.edges),
+            "counts": list(self.counts),
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+
+class SensorTelemetry:
+    def __init__(self):
+        self.notifications = 0
+        self.bytes = 0
+        self.samples = 0
+        self.index_gaps = 0  # indices that never arrived
+        self.parse_errors = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.handler_ms = Histogram(HANDLER_BUCKETS_MS)
+        self.inter_arrival_ms = Histogram(ARRIVAL_BUCKETS_MS)
+        self._last_arrival = None
+        self._last_index = None
+        # [second, notifications, bytes, samples] for the last RATE_WINDOW seconds
+        self._seconds = deque(maxlen=RATE_WINDOW + 1)
+        self._first_second = None
+
+    def _bucket(self, now):
+        second = int(now)
+        if self._first_second is None:
+            self._first_second = second
+        if not self._seconds or self._seconds[-1][0] != second:
+            self._seconds.append([second, 0, 0, 0])
+        return self._seconds[-1]
+
+    def on_notification(self, size, queue_depth, now):
+        self.notifications += 1
+        self.bytes += size
+        self.queue_depth = queue_depth
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+        if self._last_arrival is not None:
+            self.inter_arrival_ms.add((now - self._last_arrival) * 1000)
+        self._last_arrival = now
+        bucket = self._bucket(now)
+        bucket[1] += 1
+        bucket[2] += size
+
+    def on_samples(self, indices, now):
+        # indices: firmware sample indices of one parsed block, in order
+        if len(indices) == 0:
+            return
+        self.samples += len(indices)
+        self._bucket(now)[3] += len(indices)
+        if self._last_index is not None:
+            indices = np.concatenate(([self._last_index], indices))
+        steps = np.diff(indices)
+        # A step back is a board reset, not a gap
+        self.index_gaps += int(np.sum(steps[steps > 1] - 1))
+        self._last_index = indices[-1]
+
+    def on_handled(self, seconds):
+        self.handler_ms.add(seconds * 1000)
+
+    def on_error(self):
+        self.parse_errors += 1
+
+    def rates(self, now):
+        # Per-second averages over the last complete seconds; the second the
+        # stream started in is only partly filled and left out
+        current = int(now)
+        first = max(current - RATE_WINDOW, (self._first_second or current) + 1)
+        seconds = [s for s in list(self._seconds) if first <= s[0] < current]
+        if not seconds:
+            return 0.0, 0.0, 0.0
+        span = current - first
+        return tuple(sum(s[i] for s in seconds) / span for i in (1, 2, 3))
+
+
+class SessionTelemetry:
+    def __init__(self, sensor_ids, names):
+        # names: {sensor_id: display name}
+        self.names = names
+        self.sensors = {i: SensorTelemetry() for i in sensor_ids}
+        self.started = time.monotonic()
+
+    def snapshot(self, aligner=None, now=None):
+        now = time.monotonic() if now is None else now
+        snapshot = {}
+        for sensor_id, sensor in self.sensors.items():
+            notifications, size, samples = sensor.rates(now)
+            state = aligner.sensors.get(sensor_id) if aligner is not None else None
+            snapshot[sensor_id] = {
+                "notifications_per_s": notifications,
+                "bytes_per_s": size,
+                "samples_per_s": samples,
+                "notifications": sensor.notifications,
+                "bytes": sensor.bytes,
+                "samples": sensor.samples,
+                "index_gaps": sensor.index_gaps,
+                "parse_errors": sensor.parse_errors,
+                "alignment_drops": state.dropped if state is not None else 0,
+                "queue_depth": sensor.queue_depth,
+                "max_queue_depth": sensor.max_queue_depth,
+            }
+        return snapshot
+
+    def panel_text(self, aligner=None):
+        lines = []
+        for sensor_id, s in self.snapshot(aligner).items():
+            p99 = self.sensors[sensor_id].handler_ms.percentile(99)
+            lines.append(f"{self.names[sensor_id]:<11.11s} {s['samples_per_s']:5.1f} Hz "
+                         f"{s['notifications_per_s']:5.1f} pkt/s {s['bytes_per_s'] / 1000:5.2f} kB/s  "
+                         f"gaps {s['index_gaps']:<4d} err {s['parse_errors']:<3d} late {s['alignment_drops']:<4d} "
+                         f"q {s['queue_depth']:<3d} p99 {'-' if p99 is None else f'{p99:g}'} ms")
+        return "\n".join(lines)
+
+    def export(self, filename, aligner=None):
+        # Session totals, overall rates and histograms, one entry per sensor
+        duration = time.monotonic() - self.started
+        sensors = {}
+        for sensor_id, s in self.snapshot(aligner).items():
+            sensor = self.sensors[sensor_id]
+            sensors[self.names[sensor_id]] = {
+                "notifications": s["notifications"],
+                "bytes": s["bytes"],
+                "samples": s["samples"],
+                "notifications_per_s": s["notifications"] / duration if duration else None,
+                "bytes_per_s": s["bytes"] / duration if duration else None,
+                "samples_per_s": s["samples"] / duration if duration else None,
+                "index_gaps": s["index_gaps"],
+                "parse_errors": s["parse_errors"],
+                "alignment_drops": s["alignment_drops"],
+                "max_queue_depth": s["max_queue_depth"],
+                "handler_latency": sensor.handler_ms.to_dict(),
+                "inter_arrival": sensor.inter_arrival_ms.to_dict(),
+            }
+        with open(filename, 'w') as f:
+            json.dump({"duration_s": duration, "sensors": sensors}, f, indent=4)
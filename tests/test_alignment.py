@@ -0,0 +1,87 @@
+import math
+
+from alignment import SensorAligner
+
+
+def push_all(aligner, samples):
+    rows = []
+    for sensor_id, index in samples:
+        rows.extend(aligner.push(sensor_id, index, index * 40.0, [float(sensor_id * 100 + index)]))
+    return rows
+
+
+def test_frames_join_on_index():
+    aligner = SensorAligner([1, 2], include_index=False)
+    rows = push_all(aligner, [(1, 10), (2, 50), (1, 11), (2, 51), (1, 12), (2, 52)])
+    assert rows == [[400.0, 110.0, 250.0], [440.0, 111.0, 251.0], [480.0, 112.0, 252.0]]
+
+
+def test_hold_fills_a_missing_sample():
+    aligner = SensorAligner([1, 2], gap_policy="hold", max_lag=5)
+    rows = push_all(aligner, [(1, 0), (2, 0), (1, 1), (1, 2), (1, 3), (1, 4), (2, 2)])
+    # Sensor 2 never sent index 1: the frame repeats its last sample
+    assert [row[3:] for row in rows[:3]] == [[0, 200.0], [1, 200.0], [2, 202.0]]
+    stats = aligner.stats()[2]
+    assert stats["gaps"] == 1
+    assert stats["gap_spans"] == [[1, 1]]
+
+
+def test_interpolate_fills_between_neighbours():
+    aligner = SensorAligner([1, 2], gap_policy="interpolate", include_index=False)
+    rows = push_all(aligner, [(1, 0), (2, 0), (1, 1), (1, 2), (2, 2)])
+    assert rows[1] == [40.0, 101.0, 201.0]
+
+
+def test_nan_marks_a_missing_sample():
+    aligner = SensorAligner([1, 2], gap_policy="nan", include_index=False)
+    rows = push_all(aligner, [(1, 0), (2, 0), (1, 1), (1, 2), (2, 2)])
+    assert math.isnan(rows[1][2])
+
+
+def test_late_sensor_is_filled_after_max_lag():
+    aligner = SensorAligner([1, 2], max_lag=3, include_index=False)
+    rows = push_all(aligner, [(1, 0), (2, 0)] + [(1, i) for i in range(1, 5)])
+    # Sensor 1 is four frames ahead, so frame 1 is written without sensor 2
+    assert [row[1] for row in rows] == [100.0, 101.0]
+    # Sensor 2's sample for the written frame is late and dropped
+    assert push_all(aligner, [(2, 1)]) == []
+    assert aligner.stats()[2]["dropped"] == 1
+
+
+def test_duplicates_are_dropped():
+    aligner = SensorAligner([1, 2])
+    push_all(aligner, [(1, 0), (2, 0), (1, 1), (1, 1)])
+    assert aligner.stats()[1]["dropped"] == 1
+
+
+def test_flush_fills_a_sensor_that_stopped():
+    aligner = SensorAligner([1, 2], include_index=False)
+    rows = push_all(aligner, [(1, 0), (2, 0), (1, 1), (1, 2)])
+    rows += aligner.flush()
+    assert [row[2] for row in rows] == [200.0, 200.0, 200.0]
+    assert aligner.stats()[2]["gap_spans"] == [[1, 2]]
+
+
+def test_long_dropout_is_filled_in_place():
+    # Sensor 2 drops out for longer than max_gap used to allow (250 frames)
+    aligner = SensorAligner([1, 2], max_lag=5)
+    samples = [(1, 0), (2, 1000)]
+    samples += [(1, i) for i in range(1, 400)]
+    samples += [(1, i) if k % 2 else (2, 1000 + i) for i in range(400, 410) for k in (0, 1)]
+    rows = push_all(aligner, samples) + aligner.flush()
+    # The device index of sensor 2 stays on the frame of sensor 1's index
+    assert all(row[3] == row[1] + 1000 for row in rows)
+    assert aligner.stats()[2]["gap_spans"] == [[1001, 1399]]
+
+
+def test_board_reset_rebases():
+    aligner = SensorAligner([1, 2], include_index=False)
+    rows = push_all(aligner, [(1, 500), (2, 0), (1, 501), (2, 1), (1, 0), (2, 2)])
+    assert [row[1] for row in rows] == [600.0, 601.0, 100.0]
+
+
+def test_corrupt_forward_index_is_dropped():
+    aligner = SensorAligner([1, 2], max_gap=100)
+    rows = push_all(aligner, [(1, 0), (2, 0), (1, 1), (2, 1), (1, 5000), (1, 2), (2, 2)])
+    assert [row[1] for row in rows] == [0, 1, 2]
+    assert aligner.stats()[1]["dropped"] == 1
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import capture
+from ble_manager import BleManager
+from exercises import EXERCISE_CONFIG, UART_SERVICE_UUIDS
+from quality import THRESHOLDS, QualityMonitor
+from session_writer import SessionWriter
+from simulator import SimulatedTransport
+
+
+class RecordedEvents:
+    def __init__(self):
+        self.posted = []
+        self.stopped = threading.Event()
+        self.ended = threading.Event()  # stopped, or asked to abort
+
+    def post(self, kind, value=None):
+        self.posted.append((kind, value))
+        if kind in ("abort", "session_stopped"):
+            self.ended.set()
+        if kind == "session_stopped":
+            self.stopped.set()
+
+    def post_latest(self, kind, value=None):
+        self.posted.append((kind, value))
+
+    def values(self, kind):
+        return [value for posted, value in self.posted if posted == kind]
+
+
+def run_capture(tmp_path, transport, seconds, thresholds=THRESHOLDS, during=None):
+    # "Skipping" records sensors 1-4
+    config = EXERCISE_CONFIG["Skipping"]
+    ble_manager = BleManager(UART_SERVICE_UUIDS, cache_file=None, transport=transport)
+    writer = SessionWriter(str(tmp_path / "session.csv"), config["columns"])
+    events = RecordedEvents()
+    session = capture.Capture(ble_manager, config, writer, events, features=False)
+    session.quality = QualityMonitor(session.sensor_ids, capture.FREQUENCY_HZ, thresholds)
+    session.start()
+    try:
+        if during is not None:
+            during()
+        events.ended.wait(seconds)
+        session.stop()
+        assert events.stopped.wait(5)
+        session.future.result()
+    finally:
+        ble_manager.shutdown()
+    return session, events
+
+
+def test_sensor_missing_at_start_is_connected_later(tmp_path):
+    transport = SimulatedTransport(UART_SERVICE_UUIDS, seed=1)
+    transport.devices[4].down_until = float("inf")
+
+    def power_on():
+        time.sleep(0.5)
+        transport.devices[4].down_until = 0.0
+
+    session, events = run_capture(tmp_path, transport, 3.0, during=power_on)
+    assert "Still looking for: Sense Left Leg" in events.values("message")[0]
+    assert "Connected to Sense Left Leg" in events.values("status")
+    assert session.writer.rows_written > 0
+    assert session.session.reconnects[4] == 0
+
+
+def test_sensor_that_never_connects_aborts(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "QUALITY_CHECK_INTERVAL", 0.1)
+    thresholds = dict(THRESHOLDS, silent_seconds=(0.2, 0.4, 1.0))
+    transport = SimulatedTransport(UART_SERVICE_UUIDS, sensor_ids=[1, 2, 3], seed=1)
+    session, events = run_capture(tmp_path, transport, 10.0, thresholds)
+    aborts = events.values("abort")
+    assert len(aborts) == 1 and "Sense Left Leg" in aborts[0]
+    assert any(value.startswith("Check Sense Left Leg") for value in events.values("status"))
+    assert session.writer.rows_written == 0
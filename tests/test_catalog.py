@@ -0,0 +1,30 @@
+import pytest
+
+import catalog
+
+
+@pytest.mark.parametrize("date, expected", [
+    ("18102026", "20261018"),
+    ("05022025", "20250205"),
+    ("20261018", "20261018"),
+    ("20120312", "20120312"),
+    ("20090105", "20090105"),
+    ("2025-02-05", "20250205"),
+    ("", ""),
+    ("unknown", "unknown"),
+])
+def test_catalog_date(date, expected):
+    assert catalog.catalog_date(date) == expected
+
+
+def test_sessions_sort_by_date(tmp_path):
+    filename = str(tmp_path / "catalog.sqlite3")
+    for file_id, date in [("a", "05022025"), ("b", "31012025"), ("c", "01032024")]:
+        catalog.add_session({"file_id": file_id, "date": date, "label": "Good"}, filename)
+    conn = catalog.open_catalog(filename)
+    try:
+        assert [row["file_id"] for row in catalog.find_sessions(conn)] == ["c", "b", "a"]
+        assert [row["file_id"] for row in catalog.find_sessions(conn, date="31012025")] == ["b"]
+        assert [row["file_id"] for row in catalog.find_sessions(conn, date="20250131")] == ["b"]
+    finally:
+        conn.close()
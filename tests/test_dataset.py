@@ -0,0 +1,19 @@
+import numpy as np
+
+import dataset
+
+
+def test_resample_continues_across_blocks():
+    times = np.array([0.0, 30.0, 70.0, 110.0, 150.0, 200.0])
+    rows = np.column_stack((times, times * 2))
+    blocks = [rows[:3], rows[3:]]
+    grid = np.concatenate(list(dataset.resample(iter(blocks), 40.0)))
+    assert grid[:, 0].tolist() == [0.0, 40.0, 80.0, 120.0, 160.0, 200.0]
+    np.testing.assert_allclose(grid[:, 1], grid[:, 0] * 2)
+
+
+def test_resample_holds_through_repeated_timestamps():
+    rows = np.array([[0.0, 1.0], [40.0, 3.0], [40.0, 5.0], [80.0, 7.0]])
+    grid = np.concatenate(list(dataset.resample(iter([rows]), 20.0)))
+    assert grid[:, 0].tolist() == [0.0, 20.0, 40.0, 60.0, 80.0]
+    assert grid[1, 1] == 2.0
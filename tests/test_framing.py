@@ -0,0 +1,27 @@
+import protocol
+from framing import LineFramer
+
+
+def text_lines(indices):
+    return b"".join(b"%d,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n" % ((i,) + tuple(i + k / 10 for k in range(6)))
+                    for i in indices)
+
+
+def test_record_split_across_notifications():
+    framer = LineFramer()
+    data = text_lines([1, 2])
+    first_end = data.index(b"\n")
+    assert framer.feed_block(data[:10]) == b""
+    assert framer.feed_block(data[10:first_end + 5]) == data[:first_end]
+    assert framer.feed(data[first_end + 5:]) == [data[first_end + 1:-1]]
+    assert len(framer) == 0
+
+
+def test_concatenated_records_in_one_notification():
+    framer = LineFramer()
+    data = text_lines(range(4))
+    samples, errors = protocol.parse_text_block(framer.feed_block(data + b"4,1.0"))
+    assert errors == []
+    assert samples[:, 0].tolist() == [0, 1, 2, 3]
+    # The partial fifth record is kept for the next notification
+    assert framer.feed(b",0,0,0,0,0\n") == [b"4,1.0,0,0,0,0,0"]
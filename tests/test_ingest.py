@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from ingest import IngestQueue
+
+
+def fill(policy):
+    batches = []
+    queue = IngestQueue(1, lambda sensor_id, packets: batches.append(packets), maxsize=3, policy=policy)
+    offered = [queue.offer(bytes([i])) for i in range(5)]
+    queue.close()
+    asyncio.run(queue.run())
+    return queue, offered, batches
+
+
+def test_drop_oldest_keeps_the_newest():
+    queue, offered, batches = fill("drop-oldest")
+    assert offered == [True] * 5
+    assert batches == [[b"\x02", b"\x03", b"\x04"]]
+    assert queue.stats()["dropped"] == 2
+
+
+def test_count_and_drop_keeps_the_oldest():
+    queue, offered, batches = fill("count-and-drop")
+    assert offered == [True, True, True, False, False]
+    assert batches == [[b"\x00", b"\x01", b"\x02"]]
+    assert queue.stats()["max_depth"] == 3
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        IngestQueue(1, None, policy="block")
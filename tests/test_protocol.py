@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import protocol
+
+
+def text_lines(indices):
+    return b"".join(b"%d,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n" % ((i,) + tuple(i + k / 10 for k in range(6)))
+                    for i in indices)
+
+
+def test_float32_round_trip():
+    values = np.arange(18, dtype=np.float64).reshape(3, 6) / 4
+    data = protocol.encode_notification([7, 8, 9], values)
+    assert protocol.is_binary(data)
+    samples = protocol.decode_notification(data)
+    assert samples.shape == (3, 7)
+    assert samples[:, 0].tolist() == [7, 8, 9]
+    np.testing.assert_allclose(samples[:, 1:], values)
+
+
+def test_int16_round_trip_is_scaled():
+    values = [[9.81, -0.05, 1.23, 250.5, -0.1, 12.3]]
+    samples = protocol.decode_notification(protocol.encode_notification([1], values, protocol.VERSION_INT16))
+    np.testing.assert_allclose(samples[0, 1:], values[0], atol=0.051)
+
+
+def test_truncated_binary_notification():
+    data = protocol.encode_notification([1, 2], np.zeros((2, 6)))
+    with pytest.raises(ValueError, match="Truncated"):
+        protocol.decode_notification(data[:-3])
+
+
+def test_unknown_binary_version():
+    with pytest.raises(ValueError, match="Unknown protocol version"):
+        protocol.decode_notification(bytes([0xff]) + bytes(28))
+
+
+def test_text_is_not_binary():
+    assert not protocol.is_binary(b"1,0.00,0.00,9.81,0.00,0.00,0.00\n")
+    assert not protocol.is_binary(b"")
+
+
+def test_parse_text_block():
+    block = text_lines(range(5)).rstrip(b"\n")
+    samples, errors = protocol.parse_text_block(block)
+    assert errors == []
+    assert samples[:, 0].tolist() == [0, 1, 2, 3, 4]
+    np.testing.assert_allclose(samples[2, 1:], [2.0, 2.1, 2.2, 2.3, 2.4, 2.5])
+
+
+def test_malformed_lines_are_dropped_alone():
+    block = b"\n".join([b"1,0,0,0,0,0,0", b"2,0,0,0,0,0", b"3,0,0,x,0,0,0", b"4,0,0,0,0,0,0,0",
+                        b"5,0,0,0,0,0,0"])
+    samples, errors = protocol.parse_text_block(block)
+    assert samples[:, 0].tolist() == [1, 5]
+    assert [line for line, _ in errors] == [b"2,0,0,0,0,0", b"3,0,0,x,0,0,0", b"4,0,0,0,0,0,0,0"]
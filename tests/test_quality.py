@@ -0,0 +1,62 @@
+import numpy as np
+
+from quality import ACCEL_FULL_SCALE, MAX_RECONNECTS, QualityMonitor
+
+FREQUENCY_HZ = 25
+
+
+def feed_second(monitor, sensor_id, second, values):
+    # One second of samples, in 5 blocks as the notifications bring them
+    sensor = monitor.sensors[sensor_id]
+    start = second * FREQUENCY_HZ
+    for block in range(5):
+        indices = np.arange(start + block * 5, start + block * 5 + 5, dtype=float)
+        sensor.on_samples(indices, np.tile(values, (5, 1)) + indices[:, None] * 1e-3, second + block / 5)
+
+
+def actions(monitor, seconds, values=None, sensor_id=1):
+    taken = []
+    for second in range(seconds):
+        if values is not None:
+            feed_second(monitor, sensor_id, second, values)
+        verdict = monitor.check(sensor_id, second + 0.99)
+        if verdict is not None:
+            taken.append(verdict[0])
+    return taken
+
+
+def test_good_data_takes_no_action():
+    assert actions(QualityMonitor([1], FREQUENCY_HZ), 20, [0.0, 0.0, 9.8, 1.0, 2.0, 3.0]) == []
+
+
+def test_saturation_only_warns():
+    clipped = [ACCEL_FULL_SCALE, 0.0, 9.8, 1.0, 2.0, 3.0]
+    monitor = QualityMonitor([1], FREQUENCY_HZ)
+    assert actions(monitor, 30, clipped) == ["warn"]
+    assert monitor.sensors[1].forced_reconnects == 0
+
+
+def test_silent_sensor_warns_reconnects_then_aborts_once():
+    monitor = QualityMonitor([1], FREQUENCY_HZ)
+    taken = actions(monitor, 40)
+    assert taken[0] == "warn"
+    assert taken.count("reconnect") == MAX_RECONNECTS
+    assert taken.count("abort") == 1
+    assert taken[-1] == "abort"
+
+
+def test_no_abort_without_an_abort_threshold():
+    # rate_deviation has no abort step: once reconnects are used up it warns
+    monitor = QualityMonitor([1], FREQUENCY_HZ)
+    sensor = monitor.sensors[1]
+    sensor.forced_reconnects = MAX_RECONNECTS
+    taken = []
+    for second in range(20):
+        # A board sampling at twice the nominal rate
+        sensor.on_samples(np.arange(50 * second, 50 * second + 50, dtype=float),
+                          np.random.default_rng(second).normal(size=(50, 6)), second + 0.5)
+        verdict = monitor.check(1, second + 0.99)
+        if verdict is not None:
+            taken.append(verdict)
+    assert [action for action, _ in taken] == ["warn"]
+    assert "off 25 Hz" in taken[0][1]
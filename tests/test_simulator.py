@@ -0,0 +1,31 @@
+import asyncio
+import itertools
+
+from exercises import UART_SERVICE_UUIDS
+from simulator import PACKET_SIZE, SimulatedTransport
+
+
+class WideTransport(SimulatedTransport):
+    # Values as wide as "%.2f" gets for the IMU ranges, so few lines fit
+    def _samples(self, sensor_id):
+        return ((index, [-1234.56] * 6) for index in itertools.count(4000000000))
+
+
+def test_notifications_fit_the_characteristic():
+    transport = WideTransport(UART_SERVICE_UUIDS[:1], speed=10, jitter=0.0, seed=1)
+    packets = []
+
+    async def receive():
+        client = transport.create_client(transport.devices[1], None, 1.0)
+        await client.connect()
+        await client.start_notify(UART_SERVICE_UUIDS[0][2], lambda sender, data: packets.append(bytes(data)))
+        await asyncio.sleep(1.0)
+        await client.disconnect()
+
+    asyncio.run(receive())
+    assert len(packets) > 100
+    assert max(len(packet) for packet in packets) <= PACKET_SIZE
+    assert all(packet.endswith(b"\n") for packet in packets)
+    lines = b"".join(packets).splitlines()
+    indices = [int(line.split(b",")[0]) for line in lines]
+    assert indices == list(range(indices[0], indices[0] + len(indices)))
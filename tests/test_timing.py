@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from timing import DeviceClocks, SensorClock
+
+PERIOD = 0.04
+
+
+def observe_stream(clock, drift_ppm, notifications, start_index=0, jitter=0.005, seed=1):
+    rng = random.Random(seed)
+    period = PERIOD * (1 + drift_ppm / 1e6)
+    for n in range(notifications):
+        index = start_index + 3 * n + 2
+        clock.observe(index, 100.0 + index * period + abs(rng.gauss(0, jitter)))
+
+
+@pytest.mark.parametrize("drift_ppm", [0, 500, -800])
+def test_drift_is_estimated(drift_ppm):
+    clock = SensorClock(PERIOD)
+    observe_stream(clock, drift_ppm, 3000)
+    assert clock.state()["drift_ppm"] == pytest.approx(drift_ppm, abs=50)
+    assert clock.outliers == 0
+
+
+def test_times_follow_the_index_not_the_arrival():
+    clock = SensorClock(PERIOD)
+    observe_stream(clock, 0, 2000, jitter=0.0)
+    times = clock.times(np.array([6000.0, 6001.0]))
+    assert times[1] - times[0] == pytest.approx(PERIOD, rel=1e-6)
+
+
+def test_late_backlog_is_left_out_of_the_fit():
+    clock = SensorClock(PERIOD)
+    observe_stream(clock, 0, 1000, jitter=0.0)
+    slope = clock.slope
+    # A reconnect flushes buffered samples seconds after they were taken
+    assert not clock.observe(3010, 100.0 + 3010 * PERIOD + 2.0)
+    assert clock.outliers == 1
+    assert clock.slope == slope
+
+
+def test_index_going_back_starts_a_new_fit():
+    clock = SensorClock(PERIOD)
+    observe_stream(clock, 0, 500)
+    clock.observe(5, 500.0)
+    assert clock.resyncs == 1
+    assert clock.base_index == 5
+
+
+def test_sensors_share_one_time_base():
+    clocks = DeviceClocks([1, 2], 25)
+    first = clocks.timestamps_ms(1, [0, 1, 2], 10.0)
+    second = clocks.timestamps_ms(2, [100, 101, 102], 10.0)
+    assert first[0] == 0
+    np.testing.assert_allclose(second, first)
@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+
+# Sample times from the firmware sample index instead of the host clock.
+# Every notification carries a burst of samples that all arrive at nearly
+# the same moment, so stamping them with the arrival time mixes the BLE
+# connection interval into the data. Instead each sensor's index is mapped
+# onto the host's monotonic clock by a line, t = offset + period * index,
+# fitted online by least squares against the notification arrival times.
+# The slope starts at the nominal period and follows the board's crystal
+# drift; the offset absorbs the (roughly constant) transmission delay, so
+# sensors that share the host clock line up with each other.
+FORGETTING = 0.999  # weight kept per observation; ~1000 notifications, 30 s at 33 packets/s
+MIN_SPAN = 50  # weighted std of the fitted indices before the slope is estimated
+MAX_DRIFT = 0.02  # the fitted period stays within 2% of the nominal one
+MAX_DELAY = 0.5  # seconds an arrival may sit off the line before it is left out of the fit
+RESYNC_AFTER = 25  # consecutive outliers that mean the line moved (board reset, clock jump)
+
+
+class SensorClock:
+    # Online exponentially weighted least squares of arrival time on index.
+    # Observations far from the line (the firmware backlog that is flushed
+    # after a reconnect arrives seconds late) are left out of the fit; a run
+    # of them, or an index that goes back by more than a second, starts a
+    # new fit.
+    def __init__(self, period, forgetting=FORGETTING):
+        self.period = period
+        self.forgetting = forgetting
+        self.observations = 0
+        self.outliers = 0
+        self.resyncs = 0
+        self._rejected_run = 0
+        self._reset()
+
+    def _reset(self):
+        self.base_index = None
+        self.base_time = None
+        self.last_index = None
+        self.weight = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.var_x = 0.0  # weighted sums of squares, not yet divided by weight
+        self.cov_xy = 0.0
+        self.residual_ms2 = 0.0
+
+    @property
+    def slope(self):
+        # Seconds per sample index
+        if self.weight == 0 or self.var_x / self.weight < MIN_SPAN ** 2:
+            return self.period
+        slope = self.cov_xy / self.var_x
+        return min(max(slope, self.period * (1 - MAX_DRIFT)), self.period * (1 + MAX_DRIFT))
+
+    def observe(self, index, arrival):
+        # index: the newest sample of a notification, arrival: when it came in
+        # (seconds on the host's monotonic clock). Returns whether it was fitted.
+        self.observations += 1
+        if self.base_index is None or index < self.last_index - 1 / self.period:
+            if self.base_index is not None:
+                self.resyncs += 1
+            self._reset()
+            self.base_index = index
+            self.base_time = arrival
+        self.last_index = index
+        x = index - self.base_index
+        y = arrival - self.base_time
+        if self.weight:
+            residual = y - self.mean_y - self.slope * (x - self.mean_x)
+            if abs(residual) > MAX_DELAY:
+                self.outliers += 1
+                self._rejected_run += 1
+                if self._rejected_run < RESYNC_AFTER:
+                    return False
+                self.resyncs += 1
+                self._reset()
+                self.base_index = index
+                self.base_time = arrival
+                self.last_index = index
+                x = y = 0.0
+            else:
+                self.residual_ms2 = (self.forgetting * self.residual_ms2 +
+                                     (1 - self.forgetting) * (residual * 1000) ** 2)
+        self._rejected_run = 0
+        # Exponentially weighted running means and sums of squares
+        self.weight = self.forgetting * self.weight + 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.weight
+        self.mean_y += (y - self.mean_y) / self.weight
+        self.var_x = self.forgetting * self.var_x + dx * (x - self.mean_x)
+        self.cov_xy = self.forgetting * self.cov_xy + dx * (y - self.mean_y)
+        return True
+
+    def times(self, indices):
+        # Host-clock seconds of the given indices on the current line
+        slope = self.slope
+        return (self.base_time + self.mean_y - slope * (self.mean_x + self.base_index)) + slope * indices
+
+    def state(self):
+        return {
+            "drift_ppm": round((self.slope / self.period - 1) * 1e6, 1),
+            "jitter_ms": round(math.sqrt(self.residual_ms2), 3),
+            "observations": self.observations,
+            "outliers": self.outliers,
+            "resyncs": self.resyncs,
+        }
+
+
+class DeviceClocks:
+    # One SensorClock per sensor and a common origin, so timestamps of
+    # different sensors are milliseconds on the same time base
+    def __init__(self, sensor_ids, frequency_hz):
+        self.clocks = {i: SensorClock(1 / frequency_hz) for i in sensor_ids}
+        self.origin = None
+
+    def timestamps_ms(self, sensor_id, indices, arrival):
+        # indices: firmware indices of one parsed block, in order; arrival:
+        # when its newest sample came in. One fit update per block.
+        clock = self.clocks[sensor_id]
+        clock.observe(float(indices[-1]), arrival)
+        times = clock.times(np.asarray(indices, dtype=float))
+        if self.origin is None:
+            # The first sample of the session is time 0
+            self.origin = times[0]
+        return (times - self.origin) * 1000
+
+    def report(self):
+        return {i: clock.state() for i, clock in self.clocks.items()}
@@ -0,0 +1,25 @@
+class BleakTransport:
+    # Real Bluetooth backend. BleManager only talks to a transport through
+    # discover() and create_client(), so the simulator in simulator.py can
+    # stand in for the hardware. bleak is imported on first use.
+    async def discover(self, sensors, sensor_ids, timeout):
+        from discovery import discover_sensors
+        return await discover_sensors(sensors, sensor_ids, timeout=timeout)
+
+    def create_client(self, device, disconnected_callback, timeout):
+        # device is a BLEDevice or an address string
+        from bleak import BleakClient
+        return BleakClient(device, disconnected_callback=disconnected_callback, timeout=timeout)
+
+
+def create_transport(kind="ble", sensors=None, **options):
+    # "ble" for real sensors, "simulated" for generated data, "replay" to
+    # play back a recording (options: filename, speed)
+    if kind == "ble":
+        return BleakTransport()
+    from simulator import SimulatedTransport, ReplayTransport
+    if kind == "simulated":
+        return SimulatedTransport(sensors, **options)
+    if kind == "replay":
+        return ReplayTransport(sensors, **options)
+    raise ValueError(f"Unknown transport: {kind}")
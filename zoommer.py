@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from exercises import EXERCISE_CONFIG
+
+# Command line entry point. Capture runs the same engine as the GUI without
+# importing Qt, for unattended capture stations and scripted soak tests;
+# PyQt5 is only imported by the gui command.
+#
+#   python -m zoommer capture --exercise "Skipping" --duration 30
+#   python -m zoommer capture --exercise "Skipping" --duration 60 --transport simulated --discard
+#   python -m zoommer capture --exercise "Skipping" --name A --exercise "Skipping" --name B \
+#       --sensors group_b.json --duration 30
+#   python -m zoommer exercises
+#   python -m zoommer gui
+DATA_DIR = "./data"
+
+
+class HeadlessEvents:
+    # Event sink that stops the capture when it asks to be aborted and
+    # reports when the first sample came in. The capture prints its own
+    # messages and status lines.
+    def __init__(self, stop_after_first_sample=False):
+        self.stop_after_first_sample = stop_after_first_sample
+        self.capture = None
+        self.aborted = None
+        self.stopped = threading.Event()
+
+    def post(self, kind, value=None):
+        if kind == "abort":
+            self.aborted = value
+            self.capture.stop()
+        elif kind == "first_sample":
+            self.capture.log(f"First sample {value * 1000:.0f} ms after start")
+            if self.stop_after_first_sample:
+                self.capture.stop()
+        elif kind == "session_stopped":
+            self.stopped.set()
+
+    def post_latest(self, kind, value=None):
+        pass
+
+
+def transport_options(args):
+    if args.transport == "replay":
+        if not args.replay:
+            sys.exit("--transport replay needs --replay FILE")
+        return {"filename": args.replay, "speed": args.speed}
+    if args.transport == "simulated":
+        return {"speed": args.speed}
+    return {}
+
+
+def load_sensors(filename):
+    # A sensor group's device list: a JSON array of [name, service uuid,
+    # characteristic uuid], laid out like UART_SERVICE_UUIDS
+    with open(filename, 'r') as f:
+        return [tuple(sensor) for sensor in json.load(f)]
+
+
+def group_value(values, group, default=""):
+    # The group-th of a repeated option, or default if it was given fewer times
+    return values[group] if values and group < len(values) else default
+
+
+def run_capture(args):
+    from ble_manager import LoopThread, create_ble_manager
+    import catalog
+    from capture import Capture, create_writer, new_record
+    from exercises import UART_SERVICE_UUIDS
+    import records
+
+    # One sensor group per --exercise, all on one event loop. Real sensors
+    # can only be in one group, so with --transport ble every group but one
+    # needs its own --sensors list.
+    exercises = args.exercise
+    if args.sensors and len(args.sensors) > len(exercises):
+        sys.exit("More --sensors than --exercise")
+    if args.transport == "ble" and len(exercises) - len(args.sensors or []) > 1:
+        sys.exit("Every --exercise after the first needs its own --sensors with --transport ble")
+    date = args.date or datetime.now().strftime("%d%m%Y")
+    # The whole session goes under --data-dir: the catalog always, the
+    # record logs too unless --records-dir says otherwise
+    catalog_file = os.path.join(args.data_dir, os.path.basename(catalog.CATALOG_FILE))
+    records_dir = args.records_dir or (records.RECORDS_DIR if args.data_dir == DATA_DIR else args.data_dir)
+    loop_thread = LoopThread()
+    groups = []
+    for group, exercise in enumerate(exercises):
+        prefix = f"[{group + 1} {exercise}] " if len(exercises) > 1 else ""
+        print(f"{prefix}Capturing {exercise}", flush=True)
+        sensors_file = group_value(args.sensors, group, None)
+        sensors = load_sensors(sensors_file) if sensors_file else UART_SERVICE_UUIDS
+        config = EXERCISE_CONFIG[exercise]
+        ble_manager = create_ble_manager(args.transport, sensors, loop_thread=loop_thread, prefix=prefix,
+                                         **transport_options(args))
+        record = new_record(exercise, args.school, date, group_value(args.name, group),
+                            group_value(args.grade, group), group_value(args.height, group),
+                            group_value(args.gender, group))
+        writer = create_writer(args.data_dir, record, config["columns"], args.format)
+        events = HeadlessEvents(args.stop_after_first_sample)
+        capture = Capture(ble_manager, config, writer, events, prefix=prefix)
+        events.capture = capture
+        groups.append((capture, events, record))
+
+    for capture, events, record in groups:
+        capture.start()
+    try:
+        # Runs until --duration is up, Ctrl-C, or every capture stops by itself
+        deadline = None if args.duration is None else time.monotonic() + args.duration
+        for capture, events, record in groups:
+            events.stopped.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    for capture, events, record in groups:
+        capture.stop()
+    try:
+        for capture, events, record in groups:
+            events.stopped.wait()
+            capture.future.result()
+    finally:
+        for capture, events, record in groups:
+            capture.ble_manager.shutdown()
+        loop_thread.stop()
+
+    aborted = False
+    for capture, events, record in groups:
+        rows = capture.writer.rows_written
+        aborted = aborted or events.aborted is not None
+        if args.discard:
+            capture.discard()
+            capture.log(f"Discarded {rows} rows")
+        else:
+            label = args.label or ("Anomaly" if events.aborted else "Good")
+            filename = capture.save(record, label, records_dir, catalog_file)
+            capture.log(f"Saved {rows} rows labeled {label} to {filename}")
+    return 1 if aborted else 0
+
+
+def run_gui(args):
+    if args.transport == "replay" and not args.replay:
+        sys.exit("--transport replay needs --replay FILE")
+    if args.transport:
+        os.environ["ZOOMMER_TRANSPORT"] = args.transport
+    if args.replay:
+        os.environ["ZOOMMER_REPLAY"] = args.replay
+    if args.speed is not None:
+        os.environ["ZOOMMER_REPLAY_SPEED"] = str(args.speed)
+    import main3
+    return main3.main()
+
+
+def list_exercises(args):
+    for exercise_name, config in EXERCISE_CONFIG.items():
+        print(f"{exercise_name}: sensors {', '.join(str(i) for i in config['sensors'])}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="zoommer", description="Record exercise sessions from the XIAO sensors")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture = commands.add_parser("capture", help="record exercises without the GUI")
+    capture.add_argument("--exercise", required=True, action="append", choices=list(EXERCISE_CONFIG),
+                         metavar="EXERCISE", help="repeat to record several sensor groups at once")
+    capture.add_argument("--sensors", action="append", metavar="FILE",
+                         help="JSON device list of the n-th group (default: UART_SERVICE_UUIDS)")
+    capture.add_argument("--duration", type=float, help="seconds to record (default: until Ctrl-C)")
+    capture.add_argument("--transport", choices=["ble", "simulated", "replay"], default="ble")
+    capture.add_argument("--replay", help="recording to play back with --transport replay")
+    capture.add_argument("--speed", type=float, default=1.0, help="time scale of simulated or replayed sensors")
+    capture.add_argument("--format", choices=["csv", "csv.gz", "csv.zst", "binary"], default="csv")
+    capture.add_argument("--data-dir", default=DATA_DIR, help="recordings and their catalog")
+    capture.add_argument("--records-dir",
+                         help="exercise record logs (default: the current directory, or --data-dir if given)")
+    capture.add_argument("--label", choices=["Good", "Idle", "Anomaly"],
+                         help="label to save with (default: Good, Anomaly if aborted)")
+    capture.add_argument("--discard", action="store_true", help="delete the recording instead of saving it")
+    capture.add_argument("--school", default="")
+    capture.add_argument("--date", help="ddMMyyyy (default: today)")
+    # Per child: the n-th of each goes with the n-th --exercise
+    capture.add_argument("--name", action="append")
+    capture.add_argument("--grade", action="append")
+    capture.add_argument("--height", action="append")
+    capture.add_argument("--gender", action="append")
+    capture.add_argument("--stop-after-first-sample", action="store_true", help=argparse.SUPPRESS)
+    capture.set_defaults(run=run_capture)
+
+    gui = commands.add_parser("gui", help="start the exercise app")
+    gui.add_argument("--transport", choices=["ble", "simulated", "replay"],
+                     help="sensor backend (default: $ZOOMMER_TRANSPORT or ble)")
+    gui.add_argument("--replay", help="recording to play back with --transport replay")
+    gui.add_argument("--speed", type=float, help="time scale of replayed sensors")
+    gui.set_defaults(run=run_gui)
+
+    exercises = commands.add_parser("exercises", help="list the exercises and their sensors")
+    exercises.set_defaults(run=list_exercises)
+
+    args = parser.parse_args()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())